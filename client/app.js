@@ -11,21 +11,41 @@
     const PING_INTERVAL = 5000;
     const RECONNECT_DELAY = 500;
     const PATIENCE = 3000;
-    const SCALE = 12;
+    // Size the board is shown at, whatever the size of the canvas
+    const BOARD_SIZE = 768;
 
     let W = 64,
         H = 64;
     let currentColor = "#ff0000";
     let connectedNode = null;
 
-    canvas.width = W;
-    canvas.height = H;
-    canvas.style.width = canvas.width * SCALE + "px";
-    canvas.style.height = canvas.height * SCALE + "px";
+    function resize(w, h) {
+        W = w;
+        H = h;
+        const scale = Math.max(1, Math.floor(BOARD_SIZE / Math.max(W, H)));
+        canvas.width = W;
+        canvas.height = H;
+        canvas.style.width = canvas.width * scale + "px";
+        canvas.style.height = canvas.height * scale + "px";
+    }
+
+    resize(W, H);
 
     let ws = null;
     let isConnected = false;
     let pending = new Map();
+    // Highest log index this session has written or read, reads from any node wait for it
+    let lastIndex = 0;
+    // Log index the drawn canvas reflects, null until it is first loaded
+    let canvasIndex = null;
+    // canvasIndex when the socket last went down, the next sync fetches changes after it
+    let resumeIndex = null;
+    // Live changes received while the canvas is loaded or synced, applied once it is
+    let backlog = null;
+
+    function observeIndex(index) {
+        if (typeof index === "number" && index > lastIndex) lastIndex = index;
+    }
 
     function setIsConnected(v) {
         if (v === isConnected) return;
@@ -56,8 +76,10 @@
                 body: JSON.stringify({ user_id: userId, x, y, color }),
             });
 
-            if (response.ok) pending.delete(key);
-            else setTimeout(() => revertPixel(x, y), 100);
+            if (response.ok) {
+                pending.delete(key);
+                observeIndex((await response.json()).index);
+            } else setTimeout(() => revertPixel(x, y), 100);
         } catch (error) {
             setTimeout(() => revertPixel(x, y), 100);
         }
@@ -77,27 +99,81 @@
         ctx.putImageData(img, x, y);
     }
 
+    function drawCanvas(pixels) {
+        ctx.fillStyle = "#000000";
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+
+        for (let y = 0; y < H; y++) {
+            for (let x = 0; x < W; x++) {
+                const pixelIndex = y * W + x;
+                const color = pixels[pixelIndex];
+                if (color !== 0) {
+                    setPixelLocal(x, y, color);
+                }
+            }
+        }
+    }
+
     async function loadInitialCanvas() {
         try {
-            const response = await fetch("http://localhost:8080/client/pixels");
+            // A PNG of the canvas is far smaller than its colors as JSON
+            const response = await fetch(
+                `http://localhost:8080/client/pixels?encoding=png&min_index=${lastIndex}`
+            );
+            const index = Number(response.headers.get("X-Index"));
+            const image = await createImageBitmap(await response.blob());
+            observeIndex(index);
+            canvasIndex = index;
+            // The server decides the size of the canvas
+            if (image.width !== W || image.height !== H) resize(image.width, image.height);
+            ctx.drawImage(image, 0, 0);
+        } catch (error) {
+            console.error("Error loading canvas:", error);
+        }
+        applyBacklog();
+    }
+
+    // After a reconnect, fetch only what changed while the socket was down
+    async function syncCanvas(since) {
+        try {
+            const response = await fetch(
+                `http://localhost:8080/client/pixels/changes?since=${since}&min_index=${lastIndex}`
+            );
             const data = await response.json();
-            const pixels = data.pixels;
-
-            ctx.fillStyle = "#000000";
-            ctx.fillRect(0, 0, canvas.width, canvas.height);
-
-            for (let y = 0; y < H; y++) {
-                for (let x = 0; x < W; x++) {
-                    const pixelIndex = y * W + x;
-                    const color = pixels[pixelIndex];
-                    if (color !== 0) {
-                        setPixelLocal(x, y, color);
-                    }
-                }
+            if (data.canvas) {
+                drawCanvas(data.canvas);
+            } else {
+                for (const [x, y, color] of data.pixels) setPixelLocal(x, y, color);
             }
+            observeIndex(data.index);
+            canvasIndex = Math.max(canvasIndex, data.index);
+            resumeIndex = null;
         } catch (error) {
-            console.error("Error loading canvas:", error);
+            // resumeIndex is kept, so the next reconnect fetches these changes again
+            console.error("Error syncing canvas:", error);
+        }
+        applyBacklog();
+    }
+
+    function applyChanges({ pixels, index }) {
+        // Every pixel applied in one cycle on the node, as [x, y, color]
+        if (canvasIndex !== null && index <= canvasIndex) return;
+        for (const [x, y, color] of pixels) {
+            const key = `${x},${y}`;
+            if (!pending.has(key)) {
+                setPixelLocal(x, y, color);
+            } else if (pending.get(key) === color) {
+                pending.delete(key);
+            }
         }
+        observeIndex(index);
+        if (canvasIndex !== null) canvasIndex = Math.max(canvasIndex, index);
+    }
+
+    function applyBacklog() {
+        const changes = backlog || [];
+        backlog = null;
+        for (const content of changes) applyChanges(content);
     }
 
     function pickPixel(x, y) {
@@ -152,14 +228,17 @@
     function connect() {
         return new Promise((resolve) => {
             disconnect();
-            ws = new WebSocket("ws://localhost:8080/ws/");
+            const socket = new WebSocket("ws://localhost:8080/ws/");
+            ws = socket;
             setStatus("connecting…");
+            // Held back until the canvas has caught up with what was missed
+            backlog = [];
 
             let timeout = undefined;
 
             function ping() {
                 ws.send(JSON.stringify({ type: "ping" }));
-                timeout = setTimeout(disconnect, PATIENCE);
+                timeout = setTimeout(() => disconnect(true), PATIENCE);
             }
 
             ws.onopen = () => {
@@ -169,15 +248,21 @@
                 ws.send(
                     JSON.stringify({
                         type: "connect",
-                        content: { user_id: userId },
+                        content: { user_id: userId, min_index: lastIndex },
                     })
                 );
             };
 
-            ws.onclose = () => {
-                setIsConnected(false);
-                setStatus("disconnected");
+            ws.onclose = (ev) => {
+                if (canvasIndex !== null && resumeIndex === null)
+                    resumeIndex = canvasIndex;
                 clearTimeout(timeout);
+                if (ws !== socket) return;
+                // Closed by the server, as when the node is too far behind, not by us
+                ws = null;
+                setIsConnected(false);
+                setStatus(`disconnected${ev.reason ? `: ${ev.reason}` : ""}`);
+                setTimeout(connect, RECONNECT_DELAY);
             };
 
             ws.onerror = () => setStatus("error (see console)");
@@ -201,17 +286,14 @@
                     case "connected":
                         const { id: nodeId } = msg.content.node;
                         connectedNode = nodeId;
+                        observeIndex(msg.content.index);
                         setStatus(`node ${nodeId}`);
-                        loadInitialCanvas();
+                        if (canvasIndex === null) loadInitialCanvas();
+                        else syncCanvas(resumeIndex ?? canvasIndex);
                         return;
-                    case "pixel":
-                        const { x, y, color } = msg.content;
-                        const key = `${x},${y}`;
-                        if (!pending.has(key)) {
-                            setPixelLocal(x, y, color);
-                        } else if (pending.get(key) === color) {
-                            pending.delete(key);
-                        }
+                    case "changes":
+                        if (backlog !== null) backlog.push(msg.content);
+                        else applyChanges(msg.content);
                         return;
                     case "pong":
                         return;
@@ -23,17 +23,30 @@ class Settings(BaseSettings):
         alias="SERVERS",
     )
 
+    # Learner nodes, which serve reads and WebSockets but never take writes
+    learners_string: str = Field(default="", exclude=True, alias="LEARNERS")
+
     @computed_field
     def SERVERS(self) -> list[ServerNode]:
-        result = []
-        for server in self.servers_string.split(","):
-            server = server.strip()
-            if ":" in server:
-                host, port = server.split(":")
-                result.append(ServerNode(host=host, port=int(port)))
-            else:
-                result.append(ServerNode(host=server, port=8000))
-        return result
+        return parse_servers(self.servers_string)
+
+    @computed_field
+    def LEARNERS(self) -> list[ServerNode]:
+        return parse_servers(self.learners_string)
+
+
+def parse_servers(servers_string: str) -> list[ServerNode]:
+    result = []
+    for server in servers_string.split(","):
+        server = server.strip()
+        if not server:
+            continue
+        if ":" in server:
+            host, port = server.split(":")
+            result.append(ServerNode(host=host, port=int(port)))
+        else:
+            result.append(ServerNode(host=server, port=8000))
+    return result
 
 
 settings = Settings()
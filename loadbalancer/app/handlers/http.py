@@ -10,12 +10,17 @@ logger = logging.getLogger(__name__)
 
 
 class HTTPHandler:
-    def __init__(self, pool: ServerPool):
+    # Requests that only read, and so may also go to learners
+    READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, pool: ServerPool, read_pool: ServerPool | None = None):
         self.pool = pool
+        self.read_pool = read_pool or pool
         self.client = httpx.AsyncClient(timeout=30.0)
 
     async def handle(self, request: Request) -> Response:
-        if not self.pool.servers:
+        pool = self.read_pool if request.method in self.READ_METHODS else self.pool
+        if not pool.servers:
             return Response("no servers", status_code=503)
 
         body = await request.body()
@@ -24,8 +29,8 @@ class HTTPHandler:
         headers.pop("connection", None)
 
         # Try all servers
-        for _ in range(len(self.pool.servers)):
-            server = self.pool.get_next_server()
+        for _ in range(len(pool.servers)):
+            server = pool.get_next_server()
 
             url = f"{server.http_url}{request.url.path}"
             if request.url.query:
@@ -13,8 +13,10 @@ from app.handlers.websocket import WebSocketHandler
 logger = logging.getLogger(__name__)
 
 pool = ServerPool(settings.SERVERS)  # type: ignore[arg-type]
-http_handler = HTTPHandler(pool)
-ws_handler = WebSocketHandler(pool)
+# Reads and WebSockets are spread over the learners as well as the voting nodes
+read_pool = ServerPool(settings.SERVERS + settings.LEARNERS)  # type: ignore[operator]
+http_handler = HTTPHandler(pool, read_pool)
+ws_handler = WebSocketHandler(read_pool)
 
 
 async def http_endpoint(request):
@@ -48,6 +50,7 @@ app = Starlette(
 async def startup_event():
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     logger.info(f"Serving servers: {settings.SERVERS}")
+    logger.info(f"Serving learners: {settings.LEARNERS}")
 
 
 @app.on_event("shutdown")
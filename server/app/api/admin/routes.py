@@ -0,0 +1,80 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.dependencies import get_node_instance
+from app.raft.node import RaftNode, Role
+from app.schemas import PeerNode
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class TransferLeadershipRequest(BaseModel):
+    # Follower to hand over to, the most up to date one when omitted
+    target_id: str | None = None
+
+
+class TransferLeadershipResponse(BaseModel):
+    leader_id: str
+
+
+class MembersResponse(BaseModel):
+    members: list[PeerNode]
+    # Log index of the latest membership change, 0 while the initial one holds
+    index: int
+
+
+def require_leader(node: RaftNode) -> None:
+    if node.role != Role.LEADER:
+        raise HTTPException(
+            status_code=409, detail=f"Not the leader, the current leader is {node.leader_id}"
+        )
+
+
+@router.get("/members", response_model=MembersResponse)
+async def get_members(node: RaftNode = Depends(get_node_instance)):
+    return MembersResponse(members=node.members, index=node.log.config_index)
+
+
+@router.post("/members", response_model=MembersResponse)
+async def add_member(member: PeerNode, node: RaftNode = Depends(get_node_instance)):
+    require_leader(node)
+
+    index = await node.add_member(member)
+    if index is None:
+        logger.warning(f"Adding {member.node_id} to the cluster failed")
+        raise HTTPException(status_code=503, detail="Membership change failed")
+
+    return MembersResponse(members=node.members, index=index)
+
+
+@router.delete("/members/{node_id}", response_model=MembersResponse)
+async def remove_member(node_id: str, node: RaftNode = Depends(get_node_instance)):
+    require_leader(node)
+    if node_id not in {member.node_id for member in node.members}:
+        raise HTTPException(status_code=404, detail=f"{node_id} is not a member")
+
+    index = await node.remove_member(node_id)
+    if index is None:
+        logger.warning(f"Removing {node_id} from the cluster failed")
+        raise HTTPException(status_code=503, detail="Membership change failed")
+
+    return MembersResponse(members=node.members, index=index)
+
+
+@router.post("/transfer-leadership", response_model=TransferLeadershipResponse)
+async def transfer_leadership(
+    request: TransferLeadershipRequest | None = None,
+    node: RaftNode = Depends(get_node_instance),
+):
+    require_leader(node)
+
+    leader_id = await node.transfer_leadership(request.target_id if request else None)
+    if leader_id is None:
+        logger.warning(f"Leadership transfer away from {node.node_id} failed")
+        raise HTTPException(status_code=503, detail="Leadership transfer failed")
+
+    return TransferLeadershipResponse(leader_id=leader_id)
@@ -1,47 +1,319 @@
+from array import array
+import asyncio
+from enum import Enum
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import BaseModel, Field
 
-from app.canvas.state import Canvas
+from app.canvas.encoding import CanvasEncoding, encode_canvas_in_thread, region_version
+from app.canvas.state import Canvas, Region
 from app.dependencies import get_canvas_instance, get_node_instance
 from app.raft.node import RaftNode
+from app.schemas import MAX_COLOR, MAX_PIXELS_PER_BATCH, Pixel
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+class ReadConsistency(str, Enum):
+    # Whatever this node has applied, possibly behind the cluster
+    STALE = "stale"
+    # Confirmed with the leader through a heartbeat round
+    LINEARIZABLE = "linearizable"
+    # Confirmed from the leader's lease, no round trip to the followers
+    LEASE = "lease"
+
+
 class SetPixelRequest(BaseModel):
     x: int
     y: int
-    color: int
+    color: int = Field(ge=0, le=MAX_COLOR)
+    user_id: str
+
+
+class SetPixelsRequest(BaseModel):
+    # Committed atomically, as a single log entry
+    pixels: list[Pixel] = Field(min_length=1, max_length=MAX_PIXELS_PER_BATCH)
     user_id: str
 
 
 class SetPixelResponse(BaseModel):
     success: bool
+    # Log index of the write, pass it back as min_index to read it from any node
+    index: int
 
 
 class PixelsResponse(BaseModel):
+    # Row-major colors of the w x h rectangle at (x0, y0), by default the whole canvas
     pixels: list[int]
+    x0: int = 0
+    y0: int = 0
+    w: int
+    h: int
+    # Last log index applied to the pixels returned
+    index: int
+
+
+class PixelChangesResponse(BaseModel):
+    # Pixels written since the requested index as [x, y, color], each with its latest color
+    pixels: list[tuple[int, int, int]] = []
+    # The whole canvas instead, when changes that old are no longer kept
+    canvas: list[int] | None = None
+    # Last log index applied to the pixels returned
+    index: int
+
+
+class TilesResponse(BaseModel):
+    size: int
+    tile_size: int
+    # Tiles per side
+    tiles: int
+    # Row-major, the last log index that wrote to each tile
+    versions: list[int]
+    index: int
+
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+PNG_MEDIA_TYPE = "image/png"
+BINARY_RESPONSES: dict[int | str, dict] = {
+    200: {"content": {BINARY_MEDIA_TYPE: {}, PNG_MEDIA_TYPE: {}}}
+}
+
+
+async def confirm_read(consistency: ReadConsistency, min_index: int, node: RaftNode) -> None:
+    if min_index and not await node.catch_up_to(min_index):
+        raise HTTPException(status_code=503, detail=f"Node has not reached index {min_index}")
+    if consistency != ReadConsistency.STALE:
+        read_index = await node.read_index(lease=consistency == ReadConsistency.LEASE)
+        if read_index is None:
+            raise HTTPException(status_code=503, detail="Could not confirm the read with a leader")
+
+
+def requested_region(canvas: Canvas, x0: int, y0: int, w: int | None, h: int | None) -> Region:
+    """The region a read asks for, up to the right and bottom edges unless sized"""
+    region = (x0, y0, canvas.size - x0 if w is None else w, canvas.size - y0 if h is None else h)
+    if not canvas.contains_region(*region):
+        raise HTTPException(status_code=400, detail="Region outside of the canvas")
+    return region
+
+
+def encode_json(pixels: array, region: Region, index: int) -> bytes:
+    """The PixelsResponse for `pixels`, written a row at a time so that the event loop
+    gets the GIL back between rows when this runs on a worker thread"""
+    x0, y0, w, h = region
+    rows = ",".join(",".join(map(str, pixels[i : i + w])) for i in range(0, len(pixels), w))
+    return f'{{"pixels":[{rows}],"x0":{x0},"y0":{y0},"w":{w},"h":{h},"index":{index}}}'.encode()
+
+
+def representation(encoding: CanvasEncoding | None) -> str:
+    return "json" if encoding is None else encoding.value
+
+
+def canvas_headers(
+    canvas: Canvas, region: Region | None = None, encoding: CanvasEncoding | None = None
+) -> dict[str, str]:
+    # The version and the encoding make up the ETag, each encoding of the same pixels is
+    # a different body. Accept picks the encoding, so caches have to key on it
+    headers = {
+        "ETag": f'"{canvas.version}-{representation(encoding)}"',
+        "Vary": "Accept",
+        "Cache-Control": "no-cache",
+        "X-Canvas-Size": str(canvas.size),
+        "X-Index": str(canvas.version),
+    }
+    if region is not None:
+        headers["X-Region"] = ",".join(map(str, region))
+    return headers
+
 
+def not_modified(
+    canvas: Canvas, if_none_match: str, version: int, encoding: CanvasEncoding | None
+) -> Response | None:
+    """A 304 if the client holds pixels in `encoding` from `version`, the last that wrote
+    to them, or later. Any index the canvas has been read at is a valid tag for any part
+    of it"""
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        index, _, name = tag.partition("-")
+        if tag == "*" or (
+            index.isdigit() and int(index) >= version and name == representation(encoding)
+        ):
+            return Response(status_code=304, headers=canvas_headers(canvas, encoding=encoding))
+    return None
 
-@router.get("/pixels", response_model=PixelsResponse)
-async def get_all_pixels(canvas: Canvas = Depends(get_canvas_instance)):
-    return PixelsResponse(pixels=canvas.get_all_pixels())
+
+def requested_encoding(encoding: CanvasEncoding | None, accept: str) -> CanvasEncoding | None:
+    """The binary encoding a read asks for, by parameter or by Accept, None for JSON"""
+    if encoding is not None:
+        return encoding
+    if PNG_MEDIA_TYPE in accept:
+        return CanvasEncoding.PNG
+    if BINARY_MEDIA_TYPE in accept:
+        return CanvasEncoding.RAW
+    return None
+
+
+async def pixels_response(
+    canvas: Canvas, region: Region, encoding: CanvasEncoding | None, if_none_match: str
+) -> Response:
+    """The pixels of `region` as JSON, or in `encoding`. Encoding runs on a worker
+    thread, headers are taken first so they describe the pixels it was given"""
+    full = region == (0, 0, canvas.size, canvas.size)
+    if response := not_modified(canvas, if_none_match, region_version(canvas, region), encoding):
+        return response
+
+    headers = canvas_headers(canvas, None if full else region, encoding)
+    if encoding is None:
+        # The body carries the index, so it is stale whenever the canvas moves on
+        index = canvas.version
+        body = canvas.cached(("json", region), index)
+        if body is None:
+            body = await asyncio.to_thread(encode_json, canvas.region(*region), region, index)
+            canvas.cache(("json", region), index, body)
+        return Response(body, media_type="application/json", headers=headers)
+
+    headers["X-Canvas-Encoding"] = encoding.value
+    try:
+        body = await encode_canvas_in_thread(canvas, encoding, region)
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e)) from e
+    media_type = PNG_MEDIA_TYPE if encoding == CanvasEncoding.PNG else BINARY_MEDIA_TYPE
+    return Response(body, media_type=media_type, headers=headers)
+
+
+@router.get("/pixels", response_model=PixelsResponse, responses=BINARY_RESPONSES)
+async def get_all_pixels(
+    consistency: ReadConsistency = ReadConsistency.STALE,
+    min_index: int = 0,
+    x0: int = 0,
+    y0: int = 0,
+    w: int | None = None,
+    h: int | None = None,
+    encoding: CanvasEncoding | None = None,
+    accept: str = Header(default=""),
+    if_none_match: str = Header(default=""),
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    region = requested_region(canvas, x0, y0, w, h)
+    await confirm_read(consistency, min_index, node)
+    return await pixels_response(
+        canvas, region, requested_encoding(encoding, accept), if_none_match
+    )
+
+
+@router.get("/pixels.bin", response_class=Response)
+async def get_all_pixels_binary(
+    consistency: ReadConsistency = ReadConsistency.STALE,
+    min_index: int = 0,
+    x0: int = 0,
+    y0: int = 0,
+    w: int | None = None,
+    h: int | None = None,
+    encoding: CanvasEncoding = CanvasEncoding.RAW,
+    if_none_match: str = Header(default=""),
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    region = requested_region(canvas, x0, y0, w, h)
+    await confirm_read(consistency, min_index, node)
+    return await pixels_response(canvas, region, encoding, if_none_match)
+
+
+@router.get("/tiles", response_model=TilesResponse)
+async def get_tiles(
+    consistency: ReadConsistency = ReadConsistency.STALE,
+    min_index: int = 0,
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    await confirm_read(consistency, min_index, node)
+    return TilesResponse(
+        size=canvas.size,
+        tile_size=canvas.tile_size,
+        tiles=canvas.tiles,
+        versions=canvas.tile_versions.tolist(),
+        index=canvas.version,
+    )
+
+
+@router.get("/tiles/{tx}/{ty}", response_model=PixelsResponse, responses=BINARY_RESPONSES)
+async def get_tile(
+    tx: int,
+    ty: int,
+    consistency: ReadConsistency = ReadConsistency.STALE,
+    min_index: int = 0,
+    encoding: CanvasEncoding | None = None,
+    accept: str = Header(default=""),
+    if_none_match: str = Header(default=""),
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    try:
+        region = canvas.tile_bounds(tx, ty)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    await confirm_read(consistency, min_index, node)
+    return await pixels_response(
+        canvas, region, requested_encoding(encoding, accept), if_none_match
+    )
+
+
+@router.get("/pixels/changes", response_model=PixelChangesResponse)
+async def get_pixel_changes(
+    since: int = Query(ge=0),
+    consistency: ReadConsistency = ReadConsistency.STALE,
+    min_index: int = 0,
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    await confirm_read(consistency, min_index, node)
+    changes = canvas.changes_since(since)
+    if changes is None:
+        return PixelChangesResponse(canvas=canvas.get_all_pixels(), index=canvas.version)
+    return PixelChangesResponse(pixels=changes, index=canvas.version)
 
 
 @router.post("/pixel", response_model=SetPixelResponse)
-async def set_pixel(request: SetPixelRequest, node: RaftNode = Depends(get_node_instance)):
-    success = await node.submit_pixel(request.x, request.y, request.color)
-    if not success:
+async def set_pixel(
+    request: SetPixelRequest,
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    if not canvas.contains(request.x, request.y):
+        raise HTTPException(status_code=400, detail="Pixel outside of the canvas")
+
+    index = await node.submit_pixel(request.x, request.y, request.color)
+    if index is None:
         logger.warning(
             f"Failed to submit pixel at ({request.x}, {request.y}) with color {request.color} - returning 500"
         )
         raise HTTPException(status_code=500, detail="Something went wrong")
 
-    return SetPixelResponse(success=success)
+    return SetPixelResponse(success=True, index=index)
+
+
+@router.post("/pixels", response_model=SetPixelResponse)
+async def set_pixels(
+    request: SetPixelsRequest,
+    canvas: Canvas = Depends(get_canvas_instance),
+    node: RaftNode = Depends(get_node_instance),
+):
+    if not all(canvas.contains(p.x, p.y) for p in request.pixels):
+        raise HTTPException(status_code=400, detail="Pixel outside of the canvas")
+
+    index = await node.submit_pixels(
+        [p.x for p in request.pixels],
+        [p.y for p in request.pixels],
+        [p.color for p in request.pixels],
+    )
+    if index is None:
+        logger.warning(f"Failed to submit {len(request.pixels)} pixels - returning 500")
+        raise HTTPException(status_code=500, detail="Something went wrong")
+
+    return SetPixelResponse(success=True, index=index)
 
 
 @router.get("/status")
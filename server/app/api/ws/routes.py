@@ -1,19 +1,52 @@
 import asyncio
 import json
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, Field, ValidationError
 
+from app.canvas.state import Canvas
 from app.client.manager import ClientManager
-from app.dependencies import get_client_manager_instance, get_node_instance
+from app.dependencies import (
+    get_canvas_instance,
+    get_client_manager_instance,
+    get_node_instance,
+)
 from app.raft.node import RaftNode
+from app.schemas import MAX_PIXELS_PER_BATCH, Pixel
 
 router = APIRouter()
 
 
+class PixelsMessage(BaseModel):
+    pixels: list[Pixel] = Field(min_length=1, max_length=MAX_PIXELS_PER_BATCH)
+
+
+async def set_pixels(ws: WebSocket, content: object, node: RaftNode, canvas: Canvas) -> None:
+    try:
+        message = PixelsMessage.model_validate(content)
+    except ValidationError:
+        await ws.send_json({"type": "error", "message": "invalid pixels"})
+        return
+    if not all(canvas.contains(p.x, p.y) for p in message.pixels):
+        await ws.send_json({"type": "error", "message": "pixel outside of the canvas"})
+        return
+
+    index = await node.submit_pixels(
+        [p.x for p in message.pixels],
+        [p.y for p in message.pixels],
+        [p.color for p in message.pixels],
+    )
+    if index is None:
+        await ws.send_json({"type": "error", "message": "pixels could not be committed"})
+        return
+    await ws.send_json({"type": "pixels", "content": {"success": True, "index": index}})
+
+
 @router.websocket("/")
 async def websocket_endpoint(
     ws: WebSocket,
     node: RaftNode = Depends(get_node_instance),
+    canvas: Canvas = Depends(get_canvas_instance),
     manager: ClientManager = Depends(get_client_manager_instance),
 ):
     client_id = await manager.connect(ws)
@@ -24,6 +57,17 @@ async def websocket_endpoint(
                 continue
             match data.get("type", None):
                 case "connect":
+                    # A client resuming its session waits for this node to catch up with
+                    # the writes it has already seen
+                    content = data.get("content") or {}
+                    min_index = content.get("min_index", 0) if isinstance(content, dict) else 0
+                    if isinstance(min_index, int) and not await node.catch_up_to(min_index):
+                        # Closed so that the client reconnects, likely to another node
+                        await ws.close(
+                            code=status.WS_1013_TRY_AGAIN_LATER,
+                            reason=f"node has not reached index {min_index}",
+                        )
+                        return
                     await ws.send_json(
                         {
                             "type": "connected",
@@ -32,9 +76,13 @@ async def websocket_endpoint(
                                     "id": node.node_id,
                                     "role": node.role.name,
                                 },
+                                "index": node.last_applied,
                             },
                         }
                     )
+                case "pixels":
+                    # Many pixels drawn at once, committed as one log entry
+                    await set_pixels(ws, data.get("content"), node, canvas)
                 case "ping":
                     await ws.send_json(
                         {
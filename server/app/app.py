@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admin.routes import router as admin_router
 from app.api.client.routes import router as client_router
 from app.api.ws.routes import router as ws_router
 from app.canvas.state import Canvas
@@ -16,12 +17,31 @@ from app.dependencies import (
     set_node_instance,
 )
 from app.grpc.server import run_grpc_server
+from app.raft.columnar import ColumnarRaftLog
+from app.raft.log import RaftLog
 from app.raft.node import RaftNode
+from app.raft.storage import SegmentedLogStorage
+from app.schemas import PeerNode
 
 
 def create_app() -> FastAPI:
-    canvas = Canvas()
-    raft_node = RaftNode(node_id=settings.NODE_ID, peers=settings.PEERS, canvas=canvas)  # type: ignore[arg-type]
+    canvas = Canvas(size=settings.CANVAS_SIZE, tile_size=settings.CANVAS_TILE_SIZE)
+    log_class = ColumnarRaftLog if settings.LOG_BACKEND == "columnar" else RaftLog
+    log = log_class(SegmentedLogStorage(settings.DATA_DIR) if settings.DATA_DIR else None)
+    raft_node = RaftNode(
+        node_id=settings.NODE_ID,
+        peers=settings.PEERS + settings.LEARNERS,  # type: ignore[operator]
+        canvas=canvas,
+        log=log,
+        learner=settings.LEARNER,
+        stream_replication=settings.STREAM_REPLICATION,
+        member=PeerNode(
+            node_id=settings.NODE_ID,
+            host=settings.ADVERTISE_HOST or settings.NODE_ID,
+            http_port=settings.HTTP_PORT,
+            grpc_port=settings.GRPC_PORT,
+        ),
+    )
     client_manager = ClientManager()
 
     set_canvas_instance(canvas)
@@ -33,14 +53,15 @@ def create_app() -> FastAPI:
         grpc_server = await run_grpc_server(raft_node)
         raft_task = asyncio.create_task(raft_node.start())
 
-        def on_update(x: int, y: int, color: int) -> None:
+        def on_changes(changes: list[tuple[int, int, int]], index: int) -> None:
+            # One message per apply cycle, however many pixels it wrote
             asyncio.create_task(
                 client_manager.broadcast(
-                    {"type": "pixel", "content": {"x": x, "y": y, "color": color}}
+                    {"type": "changes", "content": {"pixels": changes, "index": index}}
                 )
             )
 
-        canvas.on_update = on_update
+        canvas.on_changes = on_changes
 
         yield
 
@@ -55,10 +76,13 @@ def create_app() -> FastAPI:
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
+        # Canvas reads describe the pixels they return in headers
+        expose_headers=["ETag", "X-Canvas-Size", "X-Index", "X-Region", "X-Canvas-Encoding"],
     )
 
     app.include_router(client_router, prefix="/client")
     app.include_router(ws_router, prefix="/ws")
+    app.include_router(admin_router, prefix="/admin")
 
     @app.get("/")
     def home(node: RaftNode = Depends(get_node_instance)):
@@ -0,0 +1,137 @@
+from array import array
+import asyncio
+from enum import Enum
+import io
+import itertools
+import struct
+import zlib
+
+from PIL import Image
+
+from app.canvas.state import Canvas, Region, to_bytes
+from app.raft.encoding import encode_varint
+
+
+class CanvasEncoding(str, Enum):
+    """Binary forms of a rectangle of pixels, row-major and little-endian throughout"""
+
+    # uint32 colors, as /pixels.bin serves them
+    RAW = "raw"
+    # Bits per index (4 or 8) as a byte, the number of colors as a uint16, the colors as
+    # uint32, then the index of every pixel's color, packed high nibble first at 4 bits
+    PALETTE = "palette"
+    # Runs of a single color, as a varint length followed by the uint32 color
+    RLE = "rle"
+    # RAW compressed with zlib, also how snapshots are stored
+    ZLIB = "zlib"
+    # Image of the low 24 bits of each color as RGB, paletted when it has few colors
+    PNG = "png"
+
+
+# Fastest, snapshots are taken with it on the apply path
+ZLIB_LEVEL = 1
+MAX_PALETTE_COLORS = 256
+CHUNK_PIXELS = 65_536
+
+
+def palette(pixels: array) -> tuple[list[int], bytes] | None:
+    """The distinct colors in ascending order and the index of every pixel's color, or
+    None if there are more than MAX_PALETTE_COLORS"""
+    # In chunks, so that other threads get the GIL back in between
+    chunks = [pixels[i : i + CHUNK_PIXELS] for i in range(0, len(pixels), CHUNK_PIXELS)]
+    distinct: set[int] = set()
+    for chunk in chunks:
+        distinct.update(chunk)
+        if len(distinct) > MAX_PALETTE_COLORS:
+            return None
+    colors = sorted(distinct)
+    index = {color: i for i, color in enumerate(colors)}
+    return colors, b"".join(bytes(map(index.__getitem__, chunk)) for chunk in chunks)
+
+
+def encode_palette(pixels: array) -> bytes:
+    result = palette(pixels)
+    if result is None:
+        raise ValueError(f"More than {MAX_PALETTE_COLORS} colors")
+    colors, indexes = result
+    if len(colors) <= 16:
+        bits = 4
+        if len(indexes) % 2:
+            indexes += b"\0"
+        indexes = bytes(hi << 4 | lo for hi, lo in zip(indexes[::2], indexes[1::2], strict=True))
+    else:
+        bits = 8
+    return struct.pack("<BH", bits, len(colors)) + to_bytes(array("I", colors)) + indexes
+
+
+def encode_rle(pixels: array) -> bytes:
+    out = bytearray()
+    pack = struct.Struct("<I").pack
+    for color, run in itertools.groupby(pixels):
+        out += encode_varint(sum(1 for _ in run))
+        out += pack(color)
+    return bytes(out)
+
+
+def encode_png(pixels: array, w: int, h: int) -> bytes:
+    result = palette(pixels)
+    if result is not None:
+        colors, indexes = result
+        image = Image.frombytes("P", (w, h), indexes)
+        image.putpalette(b"".join((color & 0xFFFFFF).to_bytes(3, "big") for color in colors))
+    else:
+        # Little-endian 0x??RRGGBB is laid out as B, G, R, ?
+        image = Image.frombytes("RGB", (w, h), to_bytes(pixels), "raw", "BGRX")
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def max_snapshot_bytes(size: int) -> int:
+    """Upper bound on the ZLIB encoding of a size x size canvas, zlib's compressBound"""
+    n = size * size * 4
+    return n + (n >> 12) + (n >> 14) + (n >> 25) + 13
+
+
+def encode(encoding: CanvasEncoding, pixels: array, w: int, h: int) -> bytes:
+    """`pixels`, a w x h rectangle, in the given encoding. Raises ValueError if the
+    pixels cannot be given in it, a palette with more than MAX_PALETTE_COLORS colors"""
+    match encoding:
+        case CanvasEncoding.RAW:
+            return to_bytes(pixels)
+        case CanvasEncoding.PALETTE:
+            return encode_palette(pixels)
+        case CanvasEncoding.RLE:
+            return encode_rle(pixels)
+        case CanvasEncoding.ZLIB:
+            return zlib.compress(to_bytes(pixels), ZLIB_LEVEL)
+        case CanvasEncoding.PNG:
+            return encode_png(pixels, w, h)
+
+
+def region_version(canvas: Canvas, region: Region) -> int:
+    """Version of the pixels in `region`, the canvas version when it covers all of it"""
+    if region == (0, 0, canvas.size, canvas.size):
+        return canvas.version
+    return canvas.region_version(*region)
+
+
+async def encode_canvas_in_thread(
+    canvas: Canvas, encoding: CanvasEncoding, region: Region | None = None
+) -> bytes:
+    """`region` of the canvas, by default all of it, in the given encoding. Encoded once
+    for every version of the pixels it covers. The pixels are copied on the event loop
+    and encoded on a worker thread, so that raft timers keep running during a large
+    encode"""
+    region = region or (0, 0, canvas.size, canvas.size)
+    version = region_version(canvas, region)
+    data = canvas.cached((encoding, region), version)
+    if data is None:
+        if encoding == CanvasEncoding.RAW and region == (0, 0, canvas.size, canvas.size):
+            # The snapshot already is this encoding, no need for a second copy
+            data = canvas.snapshot()
+        else:
+            pixels = canvas.region(*region)
+            data = await asyncio.to_thread(encode, encoding, pixels, region[2], region[3])
+        canvas.cache((encoding, region), version, data)
+    return data
@@ -1,16 +1,195 @@
-from collections.abc import Callable
+from array import array
+from collections import deque
+from collections.abc import Callable, Hashable
+import sys
+
+# Pixels written together as (x, y, color), and the log index they bring the canvas to
+ChangeSetCallback = Callable[[list[tuple[int, int, int]], int], None]
+
+# A rectangle of the canvas as (x0, y0, w, h)
+Region = tuple[int, int, int, int]
+
+
+def to_bytes(pixels: array) -> bytes:
+    """uint32 colors as little-endian bytes, the layout of snapshots and binary reads"""
+    if sys.byteorder == "big":
+        pixels = array("I", pixels)
+        pixels.byteswap()
+    return pixels.tobytes()
 
 
 class Canvas:
-    def __init__(self, size: int = 64, on_update: Callable[[int, int, int], None] | None = None):
+    """Square grid of uint32 colors, stored row-major in one contiguous array.
+
+    `version` is the log index the pixels reflect. Encodings of the canvas or of parts
+    of it are cached along with the version they were made at, see `cached()`, up to
+    MAX_ENCODED_BYTES, the least recently read going first.
+
+    For clients catching up on what they missed, every pixel also records the version
+    that last wrote it, and the positions written by the latest change sets are kept,
+    up to MAX_RECENT_CHANGES pixels, see changes_since().
+
+    The grid is divided into square tiles of `tile_size` pixels, the last row and column
+    of tiles being smaller when the size is not a multiple of it. Each tile records the
+    version that last wrote to it, so clients showing part of the canvas can tell which
+    of the tiles they hold are out of date.
+    """
+
+    MAX_RECENT_CHANGES = 100_000
+    MAX_ENCODED_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self, size: int = 64, on_changes: ChangeSetCallback | None = None, tile_size: int = 64
+    ):
+        if size <= 0 or tile_size <= 0:
+            raise ValueError(f"Invalid canvas size {size} with tiles of {tile_size}")
         self.size = size
-        self.grid = [[0] * size for _ in range(size)]
-        self.on_update = on_update
+        self.pixels = array("I", bytes(4 * size * size))
+        self.on_changes = on_changes
+        self.version = 0
+        self._encoded: dict[Hashable, tuple[int, bytes]] = {}
+        self._encoded_bytes = 0
+
+        # Version that last wrote each pixel, and the pixels written by recent versions.
+        # Changes are known from `_recent_since` on, older ones have been evicted
+        self.modified = array("Q", bytes(8 * size * size))
+        self._recent: deque[tuple[int, list[int]]] = deque()
+        self._recent_size = 0
+        self._recent_since = 0
+
+        self.tile_size = tile_size
+        self.tiles = -(-size // tile_size)
+        self.tile_versions = array("Q", bytes(8 * self.tiles * self.tiles))
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def get(self, x: int, y: int) -> int:
+        return self.pixels[y * self.size + x]
 
     def update(self, x: int, y: int, color: int):
-        self.grid[y][x] = color
-        if self.on_update:
-            self.on_update(x, y, color)
+        self.apply([(x, y, color)])
+
+    def apply(self, changes: list[tuple[int, int, int]], index: int | None = None):
+        """Write a batch of pixels, bringing the canvas to version `index`, and report
+        them to `on_changes` as one change set. Pixels outside of the canvas are skipped,
+        the same way on every node"""
+        pixels, modified, size = self.pixels, self.modified, self.size
+        tile_versions, tile_size, tiles = self.tile_versions, self.tile_size, self.tiles
+        version = index if index is not None else self.version + 1
+        positions = []
+        if not all(0 <= x < size and 0 <= y < size for x, y, _ in changes):
+            changes = [(x, y, c) for x, y, c in changes if 0 <= x < size and 0 <= y < size]
+        for x, y, color in changes:
+            position = y * size + x
+            pixels[position] = color & 0xFFFFFFFF
+            modified[position] = version
+            positions.append(position)
+            tile_versions[y // tile_size * tiles + x // tile_size] = version
+        self.version = version
+        if positions:
+            self._remember(version, positions)
+        if self.on_changes and changes:
+            self.on_changes(changes, self.version)
+
+    def cached(self, key: Hashable, version: int) -> bytes | None:
+        """The encoding stored under `key` if it was made at `version`, the version of the
+        pixels it encodes"""
+        entry = self._encoded.pop(key, None)
+        if entry is None:
+            return None
+        # Reinserted as the most recently read
+        self._encoded[key] = entry
+        return entry[1] if entry[0] == version else None
+
+    def cache(self, key: Hashable, version: int, data: bytes):
+        entry = self._encoded.get(key)
+        if entry is not None:
+            if entry[0] > version:
+                # Encoded from older pixels than a read that finished first
+                return
+            del self._encoded[key]
+            self._encoded_bytes -= len(entry[1])
+        self._encoded[key] = (version, data)
+        self._encoded_bytes += len(data)
+        while self._encoded_bytes > self.MAX_ENCODED_BYTES and len(self._encoded) > 1:
+            _, evicted = self._encoded.pop(next(iter(self._encoded)))
+            self._encoded_bytes -= len(evicted)
+
+    def changes_since(self, since: int) -> list[tuple[int, int, int]] | None:
+        """The pixels written after version `since` as (x, y, color), each once with its
+        current color. None if changes that old are no longer kept"""
+        if since < self._recent_since:
+            return None
+        pixels, modified, size = self.pixels, self.modified, self.size
+        changes = []
+        for version, positions in reversed(self._recent):
+            if version <= since:
+                break
+            for position in positions:
+                # A pixel is reported by the change set that wrote it last
+                if modified[position] == version:
+                    changes.append((position % size, position // size, pixels[position]))
+        return changes
+
+    def _remember(self, version: int, positions: list[int]):
+        # A change set may write a pixel more than once, keep it once
+        positions = list(dict.fromkeys(positions))
+        self._recent.append((version, positions))
+        self._recent_size += len(positions)
+        while self._recent_size > self.MAX_RECENT_CHANGES and len(self._recent) > 1:
+            evicted, positions = self._recent.popleft()
+            self._recent_size -= len(positions)
+            self._recent_since = evicted
 
     def get_all_pixels(self) -> list[int]:
-        return [pixel for row in self.grid for pixel in row]
+        return self.pixels.tolist()
+
+    def contains_region(self, x0: int, y0: int, w: int, h: int) -> bool:
+        return 0 <= x0 and 0 <= y0 and 0 < w <= self.size - x0 and 0 < h <= self.size - y0
+
+    def region(self, x0: int, y0: int, w: int, h: int) -> array:
+        """The pixels of a rectangle, row-major"""
+        if not self.contains_region(x0, y0, w, h):
+            raise ValueError(f"Region {w}x{h} at ({x0}, {y0}) is outside of the canvas")
+        pixels, size = self.pixels, self.size
+        if w == size:
+            return pixels[y0 * size : (y0 + h) * size]
+        region = array("I")
+        for y in range(y0, y0 + h):
+            region.extend(pixels[y * size + x0 : y * size + x0 + w])
+        return region
+
+    def region_version(self, x0: int, y0: int, w: int, h: int) -> int:
+        """Version that last wrote to any tile the rectangle overlaps"""
+        tile_size, tiles = self.tile_size, self.tiles
+        columns = range(x0 // tile_size, (x0 + w - 1) // tile_size + 1)
+        rows = range(y0 // tile_size, (y0 + h - 1) // tile_size + 1)
+        return max(self.tile_versions[ty * tiles + tx] for ty in rows for tx in columns)
+
+    def tile_bounds(self, tx: int, ty: int) -> tuple[int, int, int, int]:
+        """The rectangle (x0, y0, w, h) a tile covers"""
+        if not (0 <= tx < self.tiles and 0 <= ty < self.tiles):
+            raise ValueError(f"No tile ({tx}, {ty}) on a canvas of {self.tiles}x{self.tiles}")
+        x0, y0 = tx * self.tile_size, ty * self.tile_size
+        return x0, y0, min(self.tile_size, self.size - x0), min(self.tile_size, self.size - y0)
+
+    def snapshot(self) -> bytes:
+        """The whole grid as row-major little-endian uint32 colors"""
+        return to_bytes(self.pixels)
+
+    def restore(self, data: bytes, version: int = 0):
+        pixels = array("I")
+        pixels.frombytes(data)
+        if sys.byteorder == "big":
+            pixels.byteswap()
+        if len(pixels) != self.size * self.size:
+            raise ValueError(f"Snapshot holds {len(pixels)} pixels, canvas has {self.size**2}")
+        self.pixels = pixels
+        self.version = version
+        # What the snapshot changed is unknown, clients behind it reload the canvas
+        self.modified = array("Q", [version]) * len(pixels)
+        self._recent.clear()
+        self._recent_size = 0
+        self._recent_since = version
+        self.tile_versions = array("Q", [version]) * len(self.tile_versions)
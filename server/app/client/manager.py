@@ -1,4 +1,5 @@
 import asyncio
+import json
 from typing import Any
 from uuid import uuid4
 
@@ -30,13 +31,17 @@ class ClientManager:
     async def broadcast(self, message: dict) -> None:
         async with self._lock:
             clients = list(self._clients.values())
-        tasks = [asyncio.create_task(self._safe_send(ws, message)) for ws in clients]
+        if not clients:
+            return
+        # Encoded once for all clients
+        text = json.dumps(message, separators=(",", ":"))
+        tasks = [asyncio.create_task(self._safe_send(ws, text)) for ws in clients]
         for task in tasks:
             self._tasks.add(task)
             task.add_done_callback(self._tasks.discard)
 
-    async def _safe_send(self, ws: WebSocket, data):
+    async def _safe_send(self, ws: WebSocket, text: str):
         try:
-            await ws.send_json(data)
+            await ws.send_text(text)
         except Exception:
             pass
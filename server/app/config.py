@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,6 +23,19 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     HTTP_PORT: int = 8000
     GRPC_PORT: int = 50051
+    # Host other nodes reach this one at, as recorded in the cluster membership
+    ADVERTISE_HOST: str = ""
+
+    # Directory for the raft write-ahead log, the log is kept in memory only when empty
+    DATA_DIR: str = ""
+    # In-memory layout of the raft log: a list of LogEntry messages or parallel arrays
+    LOG_BACKEND: Literal["list", "columnar"] = "list"
+    # Replicate to each follower over a long-lived stream instead of unary AppendEntries
+    STREAM_REPLICATION: bool = False
+
+    # Side of the square canvas in pixels, the same on every node, and of its tiles
+    CANVAS_SIZE: int = 64
+    CANVAS_TILE_SIZE: int = 64
 
     peers_string: str = Field(
         default="node-2:node-2:8000:8001,node-2:node-3:8000:8001",
@@ -28,36 +43,48 @@ class Settings(BaseSettings):
         alias="PEERS",
     )
 
+    # Non-voting nodes the leader replicates to, and whether this node is one of them
+    learners_string: str = Field(default="", exclude=True, alias="LEARNERS")
+    LEARNER: bool = False
+
     @computed_field
     def PEERS(self) -> list[PeerNode]:
-        result: list[PeerNode] = []
-        if not self.peers_string:
-            return result
-
-        for peer in self.peers_string.split(","):
-            peer = peer.strip()
-            if ":" in peer:
-                parts = peer.split(":")
-                if len(parts) == 4:
-                    node_id, host, http_port, grpc_port = parts
-                    result.append(
-                        PeerNode(
-                            node_id=node_id,
-                            host=host,
-                            http_port=int(http_port),
-                            grpc_port=int(grpc_port),
-                        )
-                    )
-                elif len(parts) == 2:
-                    node_id, host = parts
-                    result.append(
-                        PeerNode(node_id=node_id, host=host, http_port=8000, grpc_port=8001)
+        return parse_peers(self.peers_string)
+
+    @computed_field
+    def LEARNERS(self) -> list[PeerNode]:
+        return [
+            peer.model_copy(update={"learner": True}) for peer in parse_peers(self.learners_string)
+        ]
+
+
+def parse_peers(peers_string: str) -> list[PeerNode]:
+    result: list[PeerNode] = []
+    if not peers_string:
+        return result
+
+    for peer in peers_string.split(","):
+        peer = peer.strip()
+        if ":" in peer:
+            parts = peer.split(":")
+            if len(parts) == 4:
+                node_id, host, http_port, grpc_port = parts
+                result.append(
+                    PeerNode(
+                        node_id=node_id,
+                        host=host,
+                        http_port=int(http_port),
+                        grpc_port=int(grpc_port),
                     )
-                else:
-                    result.append(PeerNode(node_id=peer, host=peer, http_port=8000, grpc_port=8001))
+                )
+            elif len(parts) == 2:
+                node_id, host = parts
+                result.append(PeerNode(node_id=node_id, host=host, http_port=8000, grpc_port=8001))
             else:
                 result.append(PeerNode(node_id=peer, host=peer, http_port=8000, grpc_port=8001))
-        return result
+        else:
+            result.append(PeerNode(node_id=peer, host=peer, http_port=8000, grpc_port=8001))
+    return result
 
 
 settings = Settings()
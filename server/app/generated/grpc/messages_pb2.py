@@ -1,54 +1,80 @@
-# -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # NO CHECKED-IN PROTOBUF GENCODE
 # source: messages.proto
 # Protobuf Python Version: 6.31.1
 """Generated protocol buffer code."""
+
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import runtime_version as _runtime_version
 from google.protobuf import symbol_database as _symbol_database
 from google.protobuf.internal import builder as _builder
+
 _runtime_version.ValidateProtobufRuntimeVersion(
-    _runtime_version.Domain.PUBLIC,
-    6,
-    31,
-    1,
-    '',
-    'messages.proto'
+    _runtime_version.Domain.PUBLIC, 6, 31, 1, "", "messages.proto"
 )
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
 
 
-
-
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0emessages.proto\x12\x12\x61pp.generated.grpc\"9\n\x12SubmitPixelRequest\x12\t\n\x01x\x18\x01 \x01(\x03\x12\t\n\x01y\x18\x02 \x01(\x03\x12\r\n\x05\x63olor\x18\x03 \x01(\x03\"&\n\x13SubmitPixelResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"g\n\x12RequestVoteRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\t\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x03\x12\x15\n\rlast_log_term\x18\x04 \x01(\x03\"9\n\x13RequestVoteResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\xac\x01\n\x14\x41ppendEntriesRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x11\n\tleader_id\x18\x02 \x01(\t\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x03\x12\x15\n\rprev_log_term\x18\x04 \x01(\x03\x12-\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x1c.app.generated.grpc.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x03\"K\n\x15\x41ppendEntriesResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x13\n\x0bmatch_index\x18\x03 \x01(\x03\"L\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\r\n\x05index\x18\x02 \x01(\x03\x12\t\n\x01x\x18\x03 \x01(\x03\x12\t\n\x01y\x18\x04 \x01(\x03\x12\r\n\x05\x63olor\x18\x05 \x01(\x03\"%\n\x12HealthCheckRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"\x8c\x01\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07node_id\x18\x02 \x01(\t\x12\x12\n\nraft_state\x18\x03 \x01(\t\x12\x14\n\x0c\x63urrent_term\x18\x04 \x01(\x03\x12\x14\n\x0c\x63ommit_index\x18\x05 \x01(\x03\x12\x14\n\x0clast_applied\x18\x06 \x01(\x03\x32\x90\x03\n\x08RaftNode\x12^\n\x0bRequestVote\x12&.app.generated.grpc.RequestVoteRequest\x1a\'.app.generated.grpc.RequestVoteResponse\x12\x64\n\rAppendEntries\x12(.app.generated.grpc.AppendEntriesRequest\x1a).app.generated.grpc.AppendEntriesResponse\x12^\n\x0bHealthCheck\x12&.app.generated.grpc.HealthCheckRequest\x1a\'.app.generated.grpc.HealthCheckResponse\x12^\n\x0bSubmitPixel\x12&.app.generated.grpc.SubmitPixelRequest\x1a\'.app.generated.grpc.SubmitPixelResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n\x0emessages.proto\x12\x12\x61pp.generated.grpc"9\n\x12SubmitPixelRequest\x12\t\n\x01x\x18\x01 \x01(\x03\x12\t\n\x01y\x18\x02 \x01(\x03\x12\r\n\x05\x63olor\x18\x03 \x01(\x03"D\n\x0e\x46orwardedWrite\x12\n\n\x02id\x18\x01 \x01(\x03\x12\n\n\x02xs\x18\x02 \x03(\x03\x12\n\n\x02ys\x18\x03 \x03(\x03\x12\x0e\n\x06\x63olors\x18\x04 \x03(\x03"D\n\x0e\x46orwardRequest\x12\x32\n\x06writes\x18\x01 \x03(\x0b\x32".app.generated.grpc.ForwardedWrite";\n\rForwardResult\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\r\n\x05index\x18\x03 \x01(\x03"E\n\x0f\x46orwardResponse\x12\x32\n\x07results\x18\x01 \x03(\x0b\x32!.app.generated.grpc.ForwardResult"5\n\x13SubmitPixelResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05index\x18\x02 \x01(\x03"\x96\x01\n\x12RequestVoteRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\t\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x03\x12\x15\n\rlast_log_term\x18\x04 \x01(\x03\x12\x10\n\x08pre_vote\x18\x05 \x01(\x08\x12\x1b\n\x13leadership_transfer\x18\x06 \x01(\x08"9\n\x13RequestVoteResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08"\xcb\x01\n\x14\x41ppendEntriesRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x11\n\tleader_id\x18\x02 \x01(\t\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x03\x12\x15\n\rprev_log_term\x18\x04 \x01(\x03\x12-\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x1c.app.generated.grpc.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x03\x12\x1d\n\x15heartbeat_interval_ms\x18\x07 \x01(\x05"\x92\x01\n\x15\x41ppendEntriesResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x13\n\x0bmatch_index\x18\x03 \x01(\x03\x12\x15\n\rconflict_term\x18\x04 \x01(\x03\x12\x16\n\x0e\x63onflict_index\x18\x05 \x01(\x03\x12\x16\n\x0elast_log_index\x18\x06 \x01(\x03"^\n\x06Member\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0c\n\x04host\x18\x02 \x01(\t\x12\x11\n\thttp_port\x18\x03 \x01(\x05\x12\x11\n\tgrpc_port\x18\x04 \x01(\x05\x12\x0f\n\x07learner\x18\x05 \x01(\x08"<\n\rClusterConfig\x12+\n\x07members\x18\x01 \x03(\x0b\x32\x1a.app.generated.grpc.Member"\xd4\x01\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\r\n\x05index\x18\x02 \x01(\x03\x12\t\n\x01x\x18\x03 \x01(\x03\x12\t\n\x01y\x18\x04 \x01(\x03\x12\r\n\x05\x63olor\x18\x05 \x01(\x03\x12+\n\x04type\x18\x06 \x01(\x0e\x32\x1d.app.generated.grpc.EntryType\x12\x31\n\x06\x63onfig\x18\x07 \x01(\x0b\x32!.app.generated.grpc.ClusterConfig\x12\n\n\x02xs\x18\x08 \x03(\x03\x12\n\n\x02ys\x18\t \x03(\x03\x12\x0e\n\x06\x63olors\x18\n \x03(\x03"\xbc\x01\n\x08Snapshot\x12\x1b\n\x13last_included_index\x18\x01 \x01(\x03\x12\x1a\n\x12last_included_term\x18\x02 \x01(\x03\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x31\n\x06\x63onfig\x18\x04 \x01(\x0b\x32!.app.generated.grpc.ClusterConfig\x12\x36\n\x08\x65ncoding\x18\x05 \x01(\x0e\x32$.app.generated.grpc.SnapshotEncoding"i\n\x16InstallSnapshotRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x11\n\tleader_id\x18\x02 \x01(\t\x12.\n\x08snapshot\x18\x03 \x01(\x0b\x32\x1c.app.generated.grpc.Snapshot"\'\n\x17InstallSnapshotResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03"!\n\x10ReadIndexRequest\x12\r\n\x05lease\x18\x01 \x01(\x08"8\n\x11ReadIndexResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\nread_index\x18\x02 \x01(\x03"4\n\x11TimeoutNowRequest\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x11\n\tleader_id\x18\x02 \x01(\t"3\n\x12TimeoutNowResponse\x12\x0c\n\x04term\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08"%\n\x12HealthCheckRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t"\x8c\x01\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07node_id\x18\x02 \x01(\t\x12\x12\n\nraft_state\x18\x03 \x01(\t\x12\x14\n\x0c\x63urrent_term\x18\x04 \x01(\x03\x12\x14\n\x0c\x63ommit_index\x18\x05 \x01(\x03\x12\x14\n\x0clast_applied\x18\x06 \x01(\x03*8\n\tEntryType\x12\t\n\x05PIXEL\x10\x00\x12\x08\n\x04NOOP\x10\x01\x12\n\n\x06\x43ONFIG\x10\x02\x12\n\n\x06PIXELS\x10\x03*%\n\x10SnapshotEncoding\x12\x07\n\x03RAW\x10\x00\x12\x08\n\x04ZLIB\x10\x01\x32\xd3\x07\n\x08RaftNode\x12^\n\x0bRequestVote\x12&.app.generated.grpc.RequestVoteRequest\x1a\'.app.generated.grpc.RequestVoteResponse\x12\x64\n\rAppendEntries\x12(.app.generated.grpc.AppendEntriesRequest\x1a).app.generated.grpc.AppendEntriesResponse\x12`\n\x07\x43\x61tchUp\x12(.app.generated.grpc.AppendEntriesRequest\x1a).app.generated.grpc.AppendEntriesResponse(\x01\x12\x64\n\tReplicate\x12(.app.generated.grpc.AppendEntriesRequest\x1a).app.generated.grpc.AppendEntriesResponse(\x01\x30\x01\x12j\n\x0fInstallSnapshot\x12*.app.generated.grpc.InstallSnapshotRequest\x1a+.app.generated.grpc.InstallSnapshotResponse\x12X\n\tReadIndex\x12$.app.generated.grpc.ReadIndexRequest\x1a%.app.generated.grpc.ReadIndexResponse\x12[\n\nTimeoutNow\x12%.app.generated.grpc.TimeoutNowRequest\x1a&.app.generated.grpc.TimeoutNowResponse\x12^\n\x0bHealthCheck\x12&.app.generated.grpc.HealthCheckRequest\x1a\'.app.generated.grpc.HealthCheckResponse\x12^\n\x0bSubmitPixel\x12&.app.generated.grpc.SubmitPixelRequest\x1a\'.app.generated.grpc.SubmitPixelResponse\x12V\n\x07\x46orward\x12".app.generated.grpc.ForwardRequest\x1a#.app.generated.grpc.ForwardResponse(\x01\x30\x01\x62\x06proto3'
+)
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
-_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'messages_pb2', _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, "messages_pb2", _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
-  DESCRIPTOR._loaded_options = None
-  _globals['_SUBMITPIXELREQUEST']._serialized_start=38
-  _globals['_SUBMITPIXELREQUEST']._serialized_end=95
-  _globals['_SUBMITPIXELRESPONSE']._serialized_start=97
-  _globals['_SUBMITPIXELRESPONSE']._serialized_end=135
-  _globals['_REQUESTVOTEREQUEST']._serialized_start=137
-  _globals['_REQUESTVOTEREQUEST']._serialized_end=240
-  _globals['_REQUESTVOTERESPONSE']._serialized_start=242
-  _globals['_REQUESTVOTERESPONSE']._serialized_end=299
-  _globals['_APPENDENTRIESREQUEST']._serialized_start=302
-  _globals['_APPENDENTRIESREQUEST']._serialized_end=474
-  _globals['_APPENDENTRIESRESPONSE']._serialized_start=476
-  _globals['_APPENDENTRIESRESPONSE']._serialized_end=551
-  _globals['_LOGENTRY']._serialized_start=553
-  _globals['_LOGENTRY']._serialized_end=629
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=631
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=668
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=671
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=811
-  _globals['_RAFTNODE']._serialized_start=814
-  _globals['_RAFTNODE']._serialized_end=1214
+    DESCRIPTOR._loaded_options = None
+    _globals["_ENTRYTYPE"]._serialized_start = 2085
+    _globals["_ENTRYTYPE"]._serialized_end = 2141
+    _globals["_SNAPSHOTENCODING"]._serialized_start = 2143
+    _globals["_SNAPSHOTENCODING"]._serialized_end = 2180
+    _globals["_SUBMITPIXELREQUEST"]._serialized_start = 38
+    _globals["_SUBMITPIXELREQUEST"]._serialized_end = 95
+    _globals["_FORWARDEDWRITE"]._serialized_start = 97
+    _globals["_FORWARDEDWRITE"]._serialized_end = 165
+    _globals["_FORWARDREQUEST"]._serialized_start = 167
+    _globals["_FORWARDREQUEST"]._serialized_end = 235
+    _globals["_FORWARDRESULT"]._serialized_start = 237
+    _globals["_FORWARDRESULT"]._serialized_end = 296
+    _globals["_FORWARDRESPONSE"]._serialized_start = 298
+    _globals["_FORWARDRESPONSE"]._serialized_end = 367
+    _globals["_SUBMITPIXELRESPONSE"]._serialized_start = 369
+    _globals["_SUBMITPIXELRESPONSE"]._serialized_end = 422
+    _globals["_REQUESTVOTEREQUEST"]._serialized_start = 425
+    _globals["_REQUESTVOTEREQUEST"]._serialized_end = 575
+    _globals["_REQUESTVOTERESPONSE"]._serialized_start = 577
+    _globals["_REQUESTVOTERESPONSE"]._serialized_end = 634
+    _globals["_APPENDENTRIESREQUEST"]._serialized_start = 637
+    _globals["_APPENDENTRIESREQUEST"]._serialized_end = 840
+    _globals["_APPENDENTRIESRESPONSE"]._serialized_start = 843
+    _globals["_APPENDENTRIESRESPONSE"]._serialized_end = 989
+    _globals["_MEMBER"]._serialized_start = 991
+    _globals["_MEMBER"]._serialized_end = 1085
+    _globals["_CLUSTERCONFIG"]._serialized_start = 1087
+    _globals["_CLUSTERCONFIG"]._serialized_end = 1147
+    _globals["_LOGENTRY"]._serialized_start = 1150
+    _globals["_LOGENTRY"]._serialized_end = 1362
+    _globals["_SNAPSHOT"]._serialized_start = 1365
+    _globals["_SNAPSHOT"]._serialized_end = 1553
+    _globals["_INSTALLSNAPSHOTREQUEST"]._serialized_start = 1555
+    _globals["_INSTALLSNAPSHOTREQUEST"]._serialized_end = 1660
+    _globals["_INSTALLSNAPSHOTRESPONSE"]._serialized_start = 1662
+    _globals["_INSTALLSNAPSHOTRESPONSE"]._serialized_end = 1701
+    _globals["_READINDEXREQUEST"]._serialized_start = 1703
+    _globals["_READINDEXREQUEST"]._serialized_end = 1736
+    _globals["_READINDEXRESPONSE"]._serialized_start = 1738
+    _globals["_READINDEXRESPONSE"]._serialized_end = 1794
+    _globals["_TIMEOUTNOWREQUEST"]._serialized_start = 1796
+    _globals["_TIMEOUTNOWREQUEST"]._serialized_end = 1848
+    _globals["_TIMEOUTNOWRESPONSE"]._serialized_start = 1850
+    _globals["_TIMEOUTNOWRESPONSE"]._serialized_end = 1901
+    _globals["_HEALTHCHECKREQUEST"]._serialized_start = 1903
+    _globals["_HEALTHCHECKREQUEST"]._serialized_end = 1940
+    _globals["_HEALTHCHECKRESPONSE"]._serialized_start = 1943
+    _globals["_HEALTHCHECKRESPONSE"]._serialized_end = 2083
+    _globals["_RAFTNODE"]._serialized_start = 2183
+    _globals["_RAFTNODE"]._serialized_end = 3162
 # @@protoc_insertion_point(module_scope)
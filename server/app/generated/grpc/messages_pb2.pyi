@@ -1,11 +1,33 @@
-from google.protobuf.internal import containers as _containers
+from collections.abc import Iterable as _Iterable
+from collections.abc import Mapping as _Mapping
+from typing import ClassVar as _ClassVar
+
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
-from collections.abc import Iterable as _Iterable, Mapping as _Mapping
-from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
+from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
+class EntryType(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    PIXEL: _ClassVar[EntryType]
+    NOOP: _ClassVar[EntryType]
+    CONFIG: _ClassVar[EntryType]
+    PIXELS: _ClassVar[EntryType]
+
+class SnapshotEncoding(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    RAW: _ClassVar[SnapshotEncoding]
+    ZLIB: _ClassVar[SnapshotEncoding]
+
+PIXEL: EntryType
+NOOP: EntryType
+CONFIG: EntryType
+PIXELS: EntryType
+RAW: SnapshotEncoding
+ZLIB: SnapshotEncoding
+
 class SubmitPixelRequest(_message.Message):
     __slots__ = ("x", "y", "color")
     X_FIELD_NUMBER: _ClassVar[int]
@@ -14,25 +36,90 @@ class SubmitPixelRequest(_message.Message):
     x: int
     y: int
     color: int
-    def __init__(self, x: _Optional[int] = ..., y: _Optional[int] = ..., color: _Optional[int] = ...) -> None: ...
+    def __init__(
+        self, x: int | None = ..., y: int | None = ..., color: int | None = ...
+    ) -> None: ...
+
+class ForwardedWrite(_message.Message):
+    __slots__ = ("id", "xs", "ys", "colors")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    XS_FIELD_NUMBER: _ClassVar[int]
+    YS_FIELD_NUMBER: _ClassVar[int]
+    COLORS_FIELD_NUMBER: _ClassVar[int]
+    id: int
+    xs: _containers.RepeatedScalarFieldContainer[int]
+    ys: _containers.RepeatedScalarFieldContainer[int]
+    colors: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(
+        self,
+        id: int | None = ...,
+        xs: _Iterable[int] | None = ...,
+        ys: _Iterable[int] | None = ...,
+        colors: _Iterable[int] | None = ...,
+    ) -> None: ...
+
+class ForwardRequest(_message.Message):
+    __slots__ = ("writes",)
+    WRITES_FIELD_NUMBER: _ClassVar[int]
+    writes: _containers.RepeatedCompositeFieldContainer[ForwardedWrite]
+    def __init__(self, writes: _Iterable[ForwardedWrite | _Mapping] | None = ...) -> None: ...
+
+class ForwardResult(_message.Message):
+    __slots__ = ("id", "success", "index")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    INDEX_FIELD_NUMBER: _ClassVar[int]
+    id: int
+    success: bool
+    index: int
+    def __init__(
+        self, id: int | None = ..., success: bool = ..., index: int | None = ...
+    ) -> None: ...
+
+class ForwardResponse(_message.Message):
+    __slots__ = ("results",)
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    results: _containers.RepeatedCompositeFieldContainer[ForwardResult]
+    def __init__(self, results: _Iterable[ForwardResult | _Mapping] | None = ...) -> None: ...
 
 class SubmitPixelResponse(_message.Message):
-    __slots__ = ("success",)
+    __slots__ = ("success", "index")
     SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    INDEX_FIELD_NUMBER: _ClassVar[int]
     success: bool
-    def __init__(self, success: bool = ...) -> None: ...
+    index: int
+    def __init__(self, success: bool = ..., index: int | None = ...) -> None: ...
 
 class RequestVoteRequest(_message.Message):
-    __slots__ = ("term", "candidate_id", "last_log_index", "last_log_term")
+    __slots__ = (
+        "term",
+        "candidate_id",
+        "last_log_index",
+        "last_log_term",
+        "pre_vote",
+        "leadership_transfer",
+    )
     TERM_FIELD_NUMBER: _ClassVar[int]
     CANDIDATE_ID_FIELD_NUMBER: _ClassVar[int]
     LAST_LOG_INDEX_FIELD_NUMBER: _ClassVar[int]
     LAST_LOG_TERM_FIELD_NUMBER: _ClassVar[int]
+    PRE_VOTE_FIELD_NUMBER: _ClassVar[int]
+    LEADERSHIP_TRANSFER_FIELD_NUMBER: _ClassVar[int]
     term: int
     candidate_id: str
     last_log_index: int
     last_log_term: int
-    def __init__(self, term: _Optional[int] = ..., candidate_id: _Optional[str] = ..., last_log_index: _Optional[int] = ..., last_log_term: _Optional[int] = ...) -> None: ...
+    pre_vote: bool
+    leadership_transfer: bool
+    def __init__(
+        self,
+        term: int | None = ...,
+        candidate_id: str | None = ...,
+        last_log_index: int | None = ...,
+        last_log_term: int | None = ...,
+        pre_vote: bool = ...,
+        leadership_transfer: bool = ...,
+    ) -> None: ...
 
 class RequestVoteResponse(_message.Message):
     __slots__ = ("term", "vote_granted")
@@ -40,53 +127,214 @@ class RequestVoteResponse(_message.Message):
     VOTE_GRANTED_FIELD_NUMBER: _ClassVar[int]
     term: int
     vote_granted: bool
-    def __init__(self, term: _Optional[int] = ..., vote_granted: bool = ...) -> None: ...
+    def __init__(self, term: int | None = ..., vote_granted: bool = ...) -> None: ...
 
 class AppendEntriesRequest(_message.Message):
-    __slots__ = ("term", "leader_id", "prev_log_index", "prev_log_term", "entries", "leader_commit")
+    __slots__ = (
+        "term",
+        "leader_id",
+        "prev_log_index",
+        "prev_log_term",
+        "entries",
+        "leader_commit",
+        "heartbeat_interval_ms",
+    )
     TERM_FIELD_NUMBER: _ClassVar[int]
     LEADER_ID_FIELD_NUMBER: _ClassVar[int]
     PREV_LOG_INDEX_FIELD_NUMBER: _ClassVar[int]
     PREV_LOG_TERM_FIELD_NUMBER: _ClassVar[int]
     ENTRIES_FIELD_NUMBER: _ClassVar[int]
     LEADER_COMMIT_FIELD_NUMBER: _ClassVar[int]
+    HEARTBEAT_INTERVAL_MS_FIELD_NUMBER: _ClassVar[int]
     term: int
     leader_id: str
     prev_log_index: int
     prev_log_term: int
     entries: _containers.RepeatedCompositeFieldContainer[LogEntry]
     leader_commit: int
-    def __init__(self, term: _Optional[int] = ..., leader_id: _Optional[str] = ..., prev_log_index: _Optional[int] = ..., prev_log_term: _Optional[int] = ..., entries: _Optional[_Iterable[_Union[LogEntry, _Mapping]]] = ..., leader_commit: _Optional[int] = ...) -> None: ...
+    heartbeat_interval_ms: int
+    def __init__(
+        self,
+        term: int | None = ...,
+        leader_id: str | None = ...,
+        prev_log_index: int | None = ...,
+        prev_log_term: int | None = ...,
+        entries: _Iterable[LogEntry | _Mapping] | None = ...,
+        leader_commit: int | None = ...,
+        heartbeat_interval_ms: int | None = ...,
+    ) -> None: ...
 
 class AppendEntriesResponse(_message.Message):
-    __slots__ = ("term", "success", "match_index")
+    __slots__ = (
+        "term",
+        "success",
+        "match_index",
+        "conflict_term",
+        "conflict_index",
+        "last_log_index",
+    )
     TERM_FIELD_NUMBER: _ClassVar[int]
     SUCCESS_FIELD_NUMBER: _ClassVar[int]
     MATCH_INDEX_FIELD_NUMBER: _ClassVar[int]
+    CONFLICT_TERM_FIELD_NUMBER: _ClassVar[int]
+    CONFLICT_INDEX_FIELD_NUMBER: _ClassVar[int]
+    LAST_LOG_INDEX_FIELD_NUMBER: _ClassVar[int]
     term: int
     success: bool
     match_index: int
-    def __init__(self, term: _Optional[int] = ..., success: bool = ..., match_index: _Optional[int] = ...) -> None: ...
+    conflict_term: int
+    conflict_index: int
+    last_log_index: int
+    def __init__(
+        self,
+        term: int | None = ...,
+        success: bool = ...,
+        match_index: int | None = ...,
+        conflict_term: int | None = ...,
+        conflict_index: int | None = ...,
+        last_log_index: int | None = ...,
+    ) -> None: ...
+
+class Member(_message.Message):
+    __slots__ = ("node_id", "host", "http_port", "grpc_port", "learner")
+    NODE_ID_FIELD_NUMBER: _ClassVar[int]
+    HOST_FIELD_NUMBER: _ClassVar[int]
+    HTTP_PORT_FIELD_NUMBER: _ClassVar[int]
+    GRPC_PORT_FIELD_NUMBER: _ClassVar[int]
+    LEARNER_FIELD_NUMBER: _ClassVar[int]
+    node_id: str
+    host: str
+    http_port: int
+    grpc_port: int
+    learner: bool
+    def __init__(
+        self,
+        node_id: str | None = ...,
+        host: str | None = ...,
+        http_port: int | None = ...,
+        grpc_port: int | None = ...,
+        learner: bool = ...,
+    ) -> None: ...
+
+class ClusterConfig(_message.Message):
+    __slots__ = ("members",)
+    MEMBERS_FIELD_NUMBER: _ClassVar[int]
+    members: _containers.RepeatedCompositeFieldContainer[Member]
+    def __init__(self, members: _Iterable[Member | _Mapping] | None = ...) -> None: ...
 
 class LogEntry(_message.Message):
-    __slots__ = ("term", "index", "x", "y", "color")
+    __slots__ = ("term", "index", "x", "y", "color", "type", "config", "xs", "ys", "colors")
     TERM_FIELD_NUMBER: _ClassVar[int]
     INDEX_FIELD_NUMBER: _ClassVar[int]
     X_FIELD_NUMBER: _ClassVar[int]
     Y_FIELD_NUMBER: _ClassVar[int]
     COLOR_FIELD_NUMBER: _ClassVar[int]
+    TYPE_FIELD_NUMBER: _ClassVar[int]
+    CONFIG_FIELD_NUMBER: _ClassVar[int]
+    XS_FIELD_NUMBER: _ClassVar[int]
+    YS_FIELD_NUMBER: _ClassVar[int]
+    COLORS_FIELD_NUMBER: _ClassVar[int]
     term: int
     index: int
     x: int
     y: int
     color: int
-    def __init__(self, term: _Optional[int] = ..., index: _Optional[int] = ..., x: _Optional[int] = ..., y: _Optional[int] = ..., color: _Optional[int] = ...) -> None: ...
+    type: EntryType
+    config: ClusterConfig
+    xs: _containers.RepeatedScalarFieldContainer[int]
+    ys: _containers.RepeatedScalarFieldContainer[int]
+    colors: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(
+        self,
+        term: int | None = ...,
+        index: int | None = ...,
+        x: int | None = ...,
+        y: int | None = ...,
+        color: int | None = ...,
+        type: EntryType | str | None = ...,
+        config: ClusterConfig | _Mapping | None = ...,
+        xs: _Iterable[int] | None = ...,
+        ys: _Iterable[int] | None = ...,
+        colors: _Iterable[int] | None = ...,
+    ) -> None: ...
+
+class Snapshot(_message.Message):
+    __slots__ = ("last_included_index", "last_included_term", "data", "config", "encoding")
+    LAST_INCLUDED_INDEX_FIELD_NUMBER: _ClassVar[int]
+    LAST_INCLUDED_TERM_FIELD_NUMBER: _ClassVar[int]
+    DATA_FIELD_NUMBER: _ClassVar[int]
+    CONFIG_FIELD_NUMBER: _ClassVar[int]
+    ENCODING_FIELD_NUMBER: _ClassVar[int]
+    last_included_index: int
+    last_included_term: int
+    data: bytes
+    config: ClusterConfig
+    encoding: SnapshotEncoding
+    def __init__(
+        self,
+        last_included_index: int | None = ...,
+        last_included_term: int | None = ...,
+        data: bytes | None = ...,
+        config: ClusterConfig | _Mapping | None = ...,
+        encoding: SnapshotEncoding | str | None = ...,
+    ) -> None: ...
+
+class InstallSnapshotRequest(_message.Message):
+    __slots__ = ("term", "leader_id", "snapshot")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    LEADER_ID_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    leader_id: str
+    snapshot: Snapshot
+    def __init__(
+        self,
+        term: int | None = ...,
+        leader_id: str | None = ...,
+        snapshot: Snapshot | _Mapping | None = ...,
+    ) -> None: ...
+
+class InstallSnapshotResponse(_message.Message):
+    __slots__ = ("term",)
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    def __init__(self, term: int | None = ...) -> None: ...
+
+class ReadIndexRequest(_message.Message):
+    __slots__ = ("lease",)
+    LEASE_FIELD_NUMBER: _ClassVar[int]
+    lease: bool
+    def __init__(self, lease: bool = ...) -> None: ...
+
+class ReadIndexResponse(_message.Message):
+    __slots__ = ("success", "read_index")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    READ_INDEX_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    read_index: int
+    def __init__(self, success: bool = ..., read_index: int | None = ...) -> None: ...
+
+class TimeoutNowRequest(_message.Message):
+    __slots__ = ("term", "leader_id")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    LEADER_ID_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    leader_id: str
+    def __init__(self, term: int | None = ..., leader_id: str | None = ...) -> None: ...
+
+class TimeoutNowResponse(_message.Message):
+    __slots__ = ("term", "success")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    success: bool
+    def __init__(self, term: int | None = ..., success: bool = ...) -> None: ...
 
 class HealthCheckRequest(_message.Message):
     __slots__ = ("node_id",)
     NODE_ID_FIELD_NUMBER: _ClassVar[int]
     node_id: str
-    def __init__(self, node_id: _Optional[str] = ...) -> None: ...
+    def __init__(self, node_id: str | None = ...) -> None: ...
 
 class HealthCheckResponse(_message.Message):
     __slots__ = ("status", "node_id", "raft_state", "current_term", "commit_index", "last_applied")
@@ -102,4 +350,12 @@ class HealthCheckResponse(_message.Message):
     current_term: int
     commit_index: int
     last_applied: int
-    def __init__(self, status: _Optional[str] = ..., node_id: _Optional[str] = ..., raft_state: _Optional[str] = ..., current_term: _Optional[int] = ..., commit_index: _Optional[int] = ..., last_applied: _Optional[int] = ...) -> None: ...
+    def __init__(
+        self,
+        status: str | None = ...,
+        node_id: str | None = ...,
+        raft_state: str | None = ...,
+        current_term: int | None = ...,
+        commit_index: int | None = ...,
+        last_applied: int | None = ...,
+    ) -> None: ...
@@ -1,31 +1,32 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
+
 import grpc
-import warnings
 
 from . import messages_pb2 as messages__pb2
 
-GRPC_GENERATED_VERSION = '1.76.0'
+GRPC_GENERATED_VERSION = "1.76.0"
 GRPC_VERSION = grpc.__version__
 _version_not_supported = False
 
 try:
     from grpc._utilities import first_version_is_lower
+
     _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
 except ImportError:
     _version_not_supported = True
 
 if _version_not_supported:
     raise RuntimeError(
-        f'The grpc package installed is at version {GRPC_VERSION},'
-        + ' but the generated code in messages_pb2_grpc.py depends on'
-        + f' grpcio>={GRPC_GENERATED_VERSION}.'
-        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
-        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+        f"The grpc package installed is at version {GRPC_VERSION},"
+        + " but the generated code in messages_pb2_grpc.py depends on"
+        + f" grpcio>={GRPC_GENERATED_VERSION}."
+        + f" Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}"
+        + f" or downgrade your generated code using grpcio-tools<={GRPC_VERSION}."
     )
 
 
-class RaftNodeStub(object):
+class RaftNodeStub:
     """Missing associated documentation comment in .proto file."""
 
     def __init__(self, channel):
@@ -35,103 +36,212 @@ class RaftNodeStub(object):
             channel: A grpc.Channel.
         """
         self.RequestVote = channel.unary_unary(
-                '/app.generated.grpc.RaftNode/RequestVote',
-                request_serializer=messages__pb2.RequestVoteRequest.SerializeToString,
-                response_deserializer=messages__pb2.RequestVoteResponse.FromString,
-                _registered_method=True)
+            "/app.generated.grpc.RaftNode/RequestVote",
+            request_serializer=messages__pb2.RequestVoteRequest.SerializeToString,
+            response_deserializer=messages__pb2.RequestVoteResponse.FromString,
+            _registered_method=True,
+        )
         self.AppendEntries = channel.unary_unary(
-                '/app.generated.grpc.RaftNode/AppendEntries',
-                request_serializer=messages__pb2.AppendEntriesRequest.SerializeToString,
-                response_deserializer=messages__pb2.AppendEntriesResponse.FromString,
-                _registered_method=True)
+            "/app.generated.grpc.RaftNode/AppendEntries",
+            request_serializer=messages__pb2.AppendEntriesRequest.SerializeToString,
+            response_deserializer=messages__pb2.AppendEntriesResponse.FromString,
+            _registered_method=True,
+        )
+        self.CatchUp = channel.stream_unary(
+            "/app.generated.grpc.RaftNode/CatchUp",
+            request_serializer=messages__pb2.AppendEntriesRequest.SerializeToString,
+            response_deserializer=messages__pb2.AppendEntriesResponse.FromString,
+            _registered_method=True,
+        )
+        self.Replicate = channel.stream_stream(
+            "/app.generated.grpc.RaftNode/Replicate",
+            request_serializer=messages__pb2.AppendEntriesRequest.SerializeToString,
+            response_deserializer=messages__pb2.AppendEntriesResponse.FromString,
+            _registered_method=True,
+        )
+        self.InstallSnapshot = channel.unary_unary(
+            "/app.generated.grpc.RaftNode/InstallSnapshot",
+            request_serializer=messages__pb2.InstallSnapshotRequest.SerializeToString,
+            response_deserializer=messages__pb2.InstallSnapshotResponse.FromString,
+            _registered_method=True,
+        )
+        self.ReadIndex = channel.unary_unary(
+            "/app.generated.grpc.RaftNode/ReadIndex",
+            request_serializer=messages__pb2.ReadIndexRequest.SerializeToString,
+            response_deserializer=messages__pb2.ReadIndexResponse.FromString,
+            _registered_method=True,
+        )
+        self.TimeoutNow = channel.unary_unary(
+            "/app.generated.grpc.RaftNode/TimeoutNow",
+            request_serializer=messages__pb2.TimeoutNowRequest.SerializeToString,
+            response_deserializer=messages__pb2.TimeoutNowResponse.FromString,
+            _registered_method=True,
+        )
         self.HealthCheck = channel.unary_unary(
-                '/app.generated.grpc.RaftNode/HealthCheck',
-                request_serializer=messages__pb2.HealthCheckRequest.SerializeToString,
-                response_deserializer=messages__pb2.HealthCheckResponse.FromString,
-                _registered_method=True)
+            "/app.generated.grpc.RaftNode/HealthCheck",
+            request_serializer=messages__pb2.HealthCheckRequest.SerializeToString,
+            response_deserializer=messages__pb2.HealthCheckResponse.FromString,
+            _registered_method=True,
+        )
         self.SubmitPixel = channel.unary_unary(
-                '/app.generated.grpc.RaftNode/SubmitPixel',
-                request_serializer=messages__pb2.SubmitPixelRequest.SerializeToString,
-                response_deserializer=messages__pb2.SubmitPixelResponse.FromString,
-                _registered_method=True)
+            "/app.generated.grpc.RaftNode/SubmitPixel",
+            request_serializer=messages__pb2.SubmitPixelRequest.SerializeToString,
+            response_deserializer=messages__pb2.SubmitPixelResponse.FromString,
+            _registered_method=True,
+        )
+        self.Forward = channel.stream_stream(
+            "/app.generated.grpc.RaftNode/Forward",
+            request_serializer=messages__pb2.ForwardRequest.SerializeToString,
+            response_deserializer=messages__pb2.ForwardResponse.FromString,
+            _registered_method=True,
+        )
 
 
-class RaftNodeServicer(object):
+class RaftNodeServicer:
     """Missing associated documentation comment in .proto file."""
 
     def RequestVote(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-        context.set_details('Method not implemented!')
-        raise NotImplementedError('Method not implemented!')
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
 
     def AppendEntries(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-        context.set_details('Method not implemented!')
-        raise NotImplementedError('Method not implemented!')
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def CatchUp(self, request_iterator, context):
+        """Streams a large backlog to a lagging follower in bounded chunks"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Replicate(self, request_iterator, context):
+        """Long-lived replication channel, each request is answered in order"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def InstallSnapshot(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def ReadIndex(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def TimeoutNow(self, request, context):
+        """Tells an up to date follower to start an election right away"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
 
     def HealthCheck(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-        context.set_details('Method not implemented!')
-        raise NotImplementedError('Method not implemented!')
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
 
     def SubmitPixel(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-        context.set_details('Method not implemented!')
-        raise NotImplementedError('Method not implemented!')
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Forward(self, request_iterator, context):
+        """Long-lived channel over which a follower forwards the writes it receives"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
 
 
 def add_RaftNodeServicer_to_server(servicer, server):
     rpc_method_handlers = {
-            'RequestVote': grpc.unary_unary_rpc_method_handler(
-                    servicer.RequestVote,
-                    request_deserializer=messages__pb2.RequestVoteRequest.FromString,
-                    response_serializer=messages__pb2.RequestVoteResponse.SerializeToString,
-            ),
-            'AppendEntries': grpc.unary_unary_rpc_method_handler(
-                    servicer.AppendEntries,
-                    request_deserializer=messages__pb2.AppendEntriesRequest.FromString,
-                    response_serializer=messages__pb2.AppendEntriesResponse.SerializeToString,
-            ),
-            'HealthCheck': grpc.unary_unary_rpc_method_handler(
-                    servicer.HealthCheck,
-                    request_deserializer=messages__pb2.HealthCheckRequest.FromString,
-                    response_serializer=messages__pb2.HealthCheckResponse.SerializeToString,
-            ),
-            'SubmitPixel': grpc.unary_unary_rpc_method_handler(
-                    servicer.SubmitPixel,
-                    request_deserializer=messages__pb2.SubmitPixelRequest.FromString,
-                    response_serializer=messages__pb2.SubmitPixelResponse.SerializeToString,
-            ),
+        "RequestVote": grpc.unary_unary_rpc_method_handler(
+            servicer.RequestVote,
+            request_deserializer=messages__pb2.RequestVoteRequest.FromString,
+            response_serializer=messages__pb2.RequestVoteResponse.SerializeToString,
+        ),
+        "AppendEntries": grpc.unary_unary_rpc_method_handler(
+            servicer.AppendEntries,
+            request_deserializer=messages__pb2.AppendEntriesRequest.FromString,
+            response_serializer=messages__pb2.AppendEntriesResponse.SerializeToString,
+        ),
+        "CatchUp": grpc.stream_unary_rpc_method_handler(
+            servicer.CatchUp,
+            request_deserializer=messages__pb2.AppendEntriesRequest.FromString,
+            response_serializer=messages__pb2.AppendEntriesResponse.SerializeToString,
+        ),
+        "Replicate": grpc.stream_stream_rpc_method_handler(
+            servicer.Replicate,
+            request_deserializer=messages__pb2.AppendEntriesRequest.FromString,
+            response_serializer=messages__pb2.AppendEntriesResponse.SerializeToString,
+        ),
+        "InstallSnapshot": grpc.unary_unary_rpc_method_handler(
+            servicer.InstallSnapshot,
+            request_deserializer=messages__pb2.InstallSnapshotRequest.FromString,
+            response_serializer=messages__pb2.InstallSnapshotResponse.SerializeToString,
+        ),
+        "ReadIndex": grpc.unary_unary_rpc_method_handler(
+            servicer.ReadIndex,
+            request_deserializer=messages__pb2.ReadIndexRequest.FromString,
+            response_serializer=messages__pb2.ReadIndexResponse.SerializeToString,
+        ),
+        "TimeoutNow": grpc.unary_unary_rpc_method_handler(
+            servicer.TimeoutNow,
+            request_deserializer=messages__pb2.TimeoutNowRequest.FromString,
+            response_serializer=messages__pb2.TimeoutNowResponse.SerializeToString,
+        ),
+        "HealthCheck": grpc.unary_unary_rpc_method_handler(
+            servicer.HealthCheck,
+            request_deserializer=messages__pb2.HealthCheckRequest.FromString,
+            response_serializer=messages__pb2.HealthCheckResponse.SerializeToString,
+        ),
+        "SubmitPixel": grpc.unary_unary_rpc_method_handler(
+            servicer.SubmitPixel,
+            request_deserializer=messages__pb2.SubmitPixelRequest.FromString,
+            response_serializer=messages__pb2.SubmitPixelResponse.SerializeToString,
+        ),
+        "Forward": grpc.stream_stream_rpc_method_handler(
+            servicer.Forward,
+            request_deserializer=messages__pb2.ForwardRequest.FromString,
+            response_serializer=messages__pb2.ForwardResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
-            'app.generated.grpc.RaftNode', rpc_method_handlers)
+        "app.generated.grpc.RaftNode", rpc_method_handlers
+    )
     server.add_generic_rpc_handlers((generic_handler,))
-    server.add_registered_method_handlers('app.generated.grpc.RaftNode', rpc_method_handlers)
+    server.add_registered_method_handlers("app.generated.grpc.RaftNode", rpc_method_handlers)
 
 
- # This class is part of an EXPERIMENTAL API.
-class RaftNode(object):
+# This class is part of an EXPERIMENTAL API.
+class RaftNode:
     """Missing associated documentation comment in .proto file."""
 
     @staticmethod
-    def RequestVote(request,
-            target,
-            options=(),
-            channel_credentials=None,
-            call_credentials=None,
-            insecure=False,
-            compression=None,
-            wait_for_ready=None,
-            timeout=None,
-            metadata=None):
+    def RequestVote(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/app.generated.grpc.RaftNode/RequestVote',
+            "/app.generated.grpc.RaftNode/RequestVote",
             messages__pb2.RequestVoteRequest.SerializeToString,
             messages__pb2.RequestVoteResponse.FromString,
             options,
@@ -142,23 +252,56 @@ class RaftNode(object):
             wait_for_ready,
             timeout,
             metadata,
-            _registered_method=True)
+            _registered_method=True,
+        )
 
     @staticmethod
-    def AppendEntries(request,
-            target,
-            options=(),
-            channel_credentials=None,
-            call_credentials=None,
-            insecure=False,
-            compression=None,
-            wait_for_ready=None,
-            timeout=None,
-            metadata=None):
+    def AppendEntries(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/app.generated.grpc.RaftNode/AppendEntries',
+            "/app.generated.grpc.RaftNode/AppendEntries",
+            messages__pb2.AppendEntriesRequest.SerializeToString,
+            messages__pb2.AppendEntriesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def CatchUp(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            "/app.generated.grpc.RaftNode/CatchUp",
             messages__pb2.AppendEntriesRequest.SerializeToString,
             messages__pb2.AppendEntriesResponse.FromString,
             options,
@@ -169,23 +312,146 @@ class RaftNode(object):
             wait_for_ready,
             timeout,
             metadata,
-            _registered_method=True)
+            _registered_method=True,
+        )
 
     @staticmethod
-    def HealthCheck(request,
+    def Replicate(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
             target,
-            options=(),
-            channel_credentials=None,
-            call_credentials=None,
-            insecure=False,
-            compression=None,
-            wait_for_ready=None,
-            timeout=None,
-            metadata=None):
+            "/app.generated.grpc.RaftNode/Replicate",
+            messages__pb2.AppendEntriesRequest.SerializeToString,
+            messages__pb2.AppendEntriesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def InstallSnapshot(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/app.generated.grpc.RaftNode/HealthCheck',
+            "/app.generated.grpc.RaftNode/InstallSnapshot",
+            messages__pb2.InstallSnapshotRequest.SerializeToString,
+            messages__pb2.InstallSnapshotResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def ReadIndex(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/app.generated.grpc.RaftNode/ReadIndex",
+            messages__pb2.ReadIndexRequest.SerializeToString,
+            messages__pb2.ReadIndexResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def TimeoutNow(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/app.generated.grpc.RaftNode/TimeoutNow",
+            messages__pb2.TimeoutNowRequest.SerializeToString,
+            messages__pb2.TimeoutNowResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def HealthCheck(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/app.generated.grpc.RaftNode/HealthCheck",
             messages__pb2.HealthCheckRequest.SerializeToString,
             messages__pb2.HealthCheckResponse.FromString,
             options,
@@ -196,23 +462,26 @@ class RaftNode(object):
             wait_for_ready,
             timeout,
             metadata,
-            _registered_method=True)
+            _registered_method=True,
+        )
 
     @staticmethod
-    def SubmitPixel(request,
-            target,
-            options=(),
-            channel_credentials=None,
-            call_credentials=None,
-            insecure=False,
-            compression=None,
-            wait_for_ready=None,
-            timeout=None,
-            metadata=None):
+    def SubmitPixel(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/app.generated.grpc.RaftNode/SubmitPixel',
+            "/app.generated.grpc.RaftNode/SubmitPixel",
             messages__pb2.SubmitPixelRequest.SerializeToString,
             messages__pb2.SubmitPixelResponse.FromString,
             options,
@@ -223,4 +492,35 @@ class RaftNode(object):
             wait_for_ready,
             timeout,
             metadata,
-            _registered_method=True)
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def Forward(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/app.generated.grpc.RaftNode/Forward",
+            messages__pb2.ForwardRequest.SerializeToString,
+            messages__pb2.ForwardResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
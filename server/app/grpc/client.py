@@ -1,55 +1,188 @@
 import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+import logging
 
+from grpc import Compression, StatusCode
 import grpc.aio as grpc
 
+from app.canvas.encoding import max_snapshot_bytes
 from app.generated.grpc.messages_pb2 import (
     AppendEntriesRequest,
     AppendEntriesResponse,
+    ForwardRequest,
+    ForwardResponse,
     HealthCheckRequest,
     HealthCheckResponse,
-    LogEntry,
+    InstallSnapshotRequest,
+    InstallSnapshotResponse,
+    ReadIndexRequest,
+    ReadIndexResponse,
     RequestVoteRequest,
     RequestVoteResponse,
-    SubmitPixelRequest,
-    SubmitPixelResponse,
+    Snapshot,
+    TimeoutNowRequest,
+    TimeoutNowResponse,
 )
 from app.generated.grpc.messages_pb2_grpc import RaftNodeStub
 from app.schemas import PeerNode
 
+logger = logging.getLogger(__name__)
+
+# gRPC's default limit on a received message
+DEFAULT_MAX_MESSAGE_BYTES = 4 << 20
+# Room for the InstallSnapshot fields besides the canvas, such as the membership
+SNAPSHOT_MESSAGE_OVERHEAD = 64 << 10
+
+
+def max_message_bytes(canvas_size: int) -> int:
+    """Limit on a gRPC message in either direction between nodes. InstallSnapshot sends
+    the whole canvas in one message, so the limit fits the largest snapshot of it"""
+    return max(
+        DEFAULT_MAX_MESSAGE_BYTES, max_snapshot_bytes(canvas_size) + SNAPSHOT_MESSAGE_OVERHEAD
+    )
+
+
+class EncodedAppendStub:
+    """AppendEntries and Replicate methods taking requests already serialized, for the
+    leader to send entries it has encoded once to every follower"""
+
+    SERVICE = "/app.generated.grpc.RaftNode"
+
+    def __init__(self, channel: grpc.Channel):
+        # Without a request serializer gRPC sends the bytes as given
+        self.AppendEntries = channel.unary_unary(
+            f"{self.SERVICE}/AppendEntries",
+            response_deserializer=AppendEntriesResponse.FromString,
+        )
+        self.Replicate = channel.stream_stream(
+            f"{self.SERVICE}/Replicate",
+            response_deserializer=AppendEntriesResponse.FromString,
+        )
+
+
+class AppendEntriesStream:
+    """Replicate stream to a single follower. The follower answers requests in the order
+    they were written, so every call waits on the next response in line."""
+
+    def __init__(self, call: grpc.StreamStreamCall):
+        self._call = call
+        self._waiters: deque[asyncio.Future[AppendEntriesResponse]] = deque()
+        self._write_lock = asyncio.Lock()
+        self._reader = asyncio.create_task(self._read())
+        self.closed = False
+
+    async def send(self, request: bytes, timeout: float) -> AppendEntriesResponse:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._write_lock:
+                    if self.closed:
+                        raise ConnectionError("stream closed")
+                    self._waiters.append(future)
+                    await self._call.write(request)
+                return await future
+        except TimeoutError:
+            # A follower that stopped answering is dropped, the next call reconnects
+            self.close()
+            raise
+        finally:
+            # Answers to requests given up on are skipped by the reader
+            future.cancel()
+
+    def close(self, error: BaseException | None = None):
+        if self.closed:
+            return
+        self.closed = True
+        self._call.cancel()
+        if self._reader is not asyncio.current_task():
+            self._reader.cancel()
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_exception(error or ConnectionError("stream closed"))
+
+    async def _read(self):
+        error: BaseException | None = None
+        try:
+            async for response in self._call:
+                future = self._waiters.popleft()
+                if not future.done():
+                    future.set_result(response)
+        except grpc.AioRpcError as e:
+            error = e
+        finally:
+            self.close(error)
+
 
 class RaftClient:
     REQUEST_VOTE_TIMEOUT = 2.0
     APPEND_ENTRIES_TIMEOUT = 1.0
+    CATCH_UP_TIMEOUT = 10.0
+    CATCH_UP_COMPRESSION = Compression.Gzip
+    INSTALL_SNAPSHOT_TIMEOUT = 10.0
     HEALTH_CHECK_TIMEOUT = 1.0
-    SUBMIT_PIXEL_TIMEOUT = 5.0
+    READ_INDEX_TIMEOUT = 2.0
+    TIMEOUT_NOW_TIMEOUT = 3.0
     GRPC_DEFAULT_TIMEOUT_MS = 60000
     GRPC_KEEPALIVE_TIME_MS = 30000
     GRPC_KEEPALIVE_TIMEOUT_MS = 15000
 
-    def __init__(self, node_id: str):
+    def __init__(
+        self,
+        node_id: str,
+        stream_replication: bool = False,
+        max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES,
+    ):
         self.node_id = node_id
+        self.max_message_bytes = max_message_bytes
         self._channels: dict[str, grpc.Channel] = {}
         self._stubs: dict[str, RaftNodeStub] = {}
+        self._encoded_stubs: dict[str, EncodedAppendStub] = {}
+
+        # AppendEntries go over one Replicate stream per follower rather than as unary
+        # calls, followers that do not implement the stream are sent unary calls
+        self.stream_replication = stream_replication
+        self._append_streams: dict[str, AppendEntriesStream] = {}
+        self._unary_peers: set[str] = set()
+
+    def _get_channel(self, peer: PeerNode) -> grpc.Channel:
+        peer_key = f"{peer.host}:{peer.grpc_port}"
+        if peer_key not in self._channels:
+            options = [
+                ("grpc.default_timeout_ms", self.GRPC_DEFAULT_TIMEOUT_MS),
+                ("grpc.keepalive_time_ms", self.GRPC_KEEPALIVE_TIME_MS),
+                ("grpc.keepalive_timeout_ms", self.GRPC_KEEPALIVE_TIMEOUT_MS),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+                ("grpc.http2.min_time_between_pings_ms", 10000),
+                ("grpc.http2.min_ping_interval_without_data_ms", 300000),
+                ("grpc.max_send_message_length", self.max_message_bytes),
+                ("grpc.max_receive_message_length", self.max_message_bytes),
+            ]
+            self._channels[peer_key] = grpc.insecure_channel(peer.grpc_address, options=options)
+        return self._channels[peer_key]
 
     def _get_stub(self, peer: PeerNode) -> RaftNodeStub:
         peer_key = f"{peer.host}:{peer.grpc_port}"
         if peer_key not in self._stubs:
-            if peer_key not in self._channels:
-                options = [
-                    ("grpc.default_timeout_ms", self.GRPC_DEFAULT_TIMEOUT_MS),
-                    ("grpc.keepalive_time_ms", self.GRPC_KEEPALIVE_TIME_MS),
-                    ("grpc.keepalive_timeout_ms", self.GRPC_KEEPALIVE_TIMEOUT_MS),
-                    ("grpc.keepalive_permit_without_calls", 1),
-                    ("grpc.http2.max_pings_without_data", 0),
-                    ("grpc.http2.min_time_between_pings_ms", 10000),
-                    ("grpc.http2.min_ping_interval_without_data_ms", 300000),
-                ]
-                self._channels[peer_key] = grpc.insecure_channel(peer.grpc_address, options=options)
-            self._stubs[peer_key] = RaftNodeStub(self._channels[peer_key])
+            self._stubs[peer_key] = RaftNodeStub(self._get_channel(peer))
         return self._stubs[peer_key]
 
+    def _get_encoded_stub(self, peer: PeerNode) -> EncodedAppendStub:
+        peer_key = f"{peer.host}:{peer.grpc_port}"
+        if peer_key not in self._encoded_stubs:
+            self._encoded_stubs[peer_key] = EncodedAppendStub(self._get_channel(peer))
+        return self._encoded_stubs[peer_key]
+
     async def request_vote(
-        self, peer: PeerNode, term: int, last_log_index: int, last_log_term: int
+        self,
+        peer: PeerNode,
+        term: int,
+        last_log_index: int,
+        last_log_term: int,
+        pre_vote: bool = False,
+        leadership_transfer: bool = False,
     ) -> RequestVoteResponse:
         stub = self._get_stub(peer)
         request = RequestVoteRequest(
@@ -57,6 +190,8 @@ class RaftClient:
             candidate_id=self.node_id,
             last_log_index=last_log_index,
             last_log_term=last_log_term,
+            pre_vote=pre_vote,
+            leadership_transfer=leadership_transfer,
         )
         return await stub.RequestVote(request, timeout=self.REQUEST_VOTE_TIMEOUT)
 
@@ -67,50 +202,79 @@ class RaftClient:
         leader_id: str,
         prev_log_index: int,
         prev_log_term: int,
-        entries: list[LogEntry],
+        entries: bytes,
         leader_commit: int,
+        heartbeat_interval_ms: int = 0,
     ) -> AppendEntriesResponse:
-        stub = self._get_stub(peer)
-        request = AppendEntriesRequest(
-            term=term,
-            leader_id=leader_id,
-            prev_log_index=prev_log_index,
-            prev_log_term=prev_log_term,
-            entries=entries,
-            leader_commit=leader_commit,
+        """Send an AppendEntries whose `entries` are given already encoded, see
+        EntryEncoder"""
+        stub = self._get_encoded_stub(peer)
+        request = (
+            AppendEntriesRequest(
+                term=term,
+                leader_id=leader_id,
+                prev_log_index=prev_log_index,
+                prev_log_term=prev_log_term,
+                leader_commit=leader_commit,
+                heartbeat_interval_ms=heartbeat_interval_ms,
+            ).SerializeToString()
+            + entries
         )
+        if self.stream_replication and peer.grpc_address not in self._unary_peers:
+            try:
+                return await self._append_stream(peer).send(request, self.APPEND_ENTRIES_TIMEOUT)
+            except grpc.AioRpcError as e:
+                if e.code() != StatusCode.UNIMPLEMENTED:
+                    raise
+                logger.info(f"{peer.node_id} has no Replicate stream, using unary AppendEntries")
+                self._unary_peers.add(peer.grpc_address)
         return await stub.AppendEntries(request, timeout=self.APPEND_ENTRIES_TIMEOUT)
 
+    def _append_stream(self, peer: PeerNode) -> AppendEntriesStream:
+        stream = self._append_streams.get(peer.grpc_address)
+        if stream is None or stream.closed:
+            stream = AppendEntriesStream(self._get_encoded_stub(peer).Replicate(timeout=None))
+            self._append_streams[peer.grpc_address] = stream
+        return stream
+
+    async def catch_up(
+        self, peer: PeerNode, requests: AsyncIterator[AppendEntriesRequest]
+    ) -> AppendEntriesResponse:
+        stub = self._get_stub(peer)
+        return await stub.CatchUp(
+            requests, timeout=self.CATCH_UP_TIMEOUT, compression=self.CATCH_UP_COMPRESSION
+        )
+
+    async def install_snapshot(
+        self, peer: PeerNode, term: int, leader_id: str, snapshot: Snapshot
+    ) -> InstallSnapshotResponse:
+        stub = self._get_stub(peer)
+        request = InstallSnapshotRequest(term=term, leader_id=leader_id, snapshot=snapshot)
+        # Snapshots are stored compressed, they are not compressed again on the wire
+        return await stub.InstallSnapshot(request, timeout=self.INSTALL_SNAPSHOT_TIMEOUT)
+
     async def health_check(self, peer: PeerNode) -> HealthCheckResponse:
         stub = self._get_stub(peer)
         request = HealthCheckRequest(node_id=self.node_id)
         return await stub.HealthCheck(request, timeout=self.HEALTH_CHECK_TIMEOUT)
 
-    async def submit_pixel(self, peer: PeerNode, x: int, y: int, color: int) -> SubmitPixelResponse:
+    def forward(self, peer: PeerNode) -> grpc.StreamStreamCall[ForwardRequest, ForwardResponse]:
+        """Open a forwarding stream to `peer`, it has no deadline and lives until cancelled"""
         stub = self._get_stub(peer)
-        request = SubmitPixelRequest(x=x, y=y, color=color)
-        return await stub.SubmitPixel(request, timeout=self.SUBMIT_PIXEL_TIMEOUT)
-
-    async def broadcast_request_votes(
-        self, peers: list[PeerNode], term: int, last_log_index: int, last_log_term: int
-    ) -> list[RequestVoteResponse]:
-        requests = [self.request_vote(peer, term, last_log_index, last_log_term) for peer in peers]
-        results = await asyncio.gather(*requests, return_exceptions=True)
+        return stub.Forward(timeout=None)
 
-        return [resp for resp in results if isinstance(resp, RequestVoteResponse)]
+    async def read_index(self, peer: PeerNode, lease: bool) -> ReadIndexResponse:
+        stub = self._get_stub(peer)
+        request = ReadIndexRequest(lease=lease)
+        return await stub.ReadIndex(request, timeout=self.READ_INDEX_TIMEOUT)
 
-    async def broadcast_health_checks(self, peers: list[PeerNode]) -> list[HealthCheckResponse]:
-        requests = [self.health_check(peer) for peer in peers]
-        results = await asyncio.gather(*requests, return_exceptions=True)
-        return [resp for resp in results if isinstance(resp, HealthCheckResponse)]
+    async def timeout_now(self, peer: PeerNode, term: int) -> TimeoutNowResponse:
+        stub = self._get_stub(peer)
+        request = TimeoutNowRequest(term=term, leader_id=self.node_id)
+        return await stub.TimeoutNow(request, timeout=self.TIMEOUT_NOW_TIMEOUT)
 
     async def close_all(self):
         for channel in self._channels.values():
             await channel.close()
         self._channels.clear()
         self._stubs.clear()
-
-    async def peer_request_vote(
-        self, peer: PeerNode, term: int, last_log_index: int, last_log_term: int
-    ) -> RequestVoteResponse:
-        return await self.request_vote(peer, term, last_log_index, last_log_term)
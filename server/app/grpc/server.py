@@ -8,12 +8,20 @@ from app.generated.grpc.messages_pb2 import (
     AppendEntriesResponse,
     HealthCheckRequest,
     HealthCheckResponse,
+    InstallSnapshotRequest,
+    InstallSnapshotResponse,
+    ReadIndexRequest,
+    ReadIndexResponse,
     RequestVoteRequest,
     RequestVoteResponse,
     SubmitPixelRequest,
     SubmitPixelResponse,
+    TimeoutNowRequest,
+    TimeoutNowResponse,
 )
 from app.generated.grpc.messages_pb2_grpc import RaftNodeServicer, add_RaftNodeServicer_to_server
+from app.grpc.client import max_message_bytes
+from app.raft.forwarder import serve_forwarded
 from app.raft.node import RaftNode
 
 logger = logging.getLogger(__name__)
@@ -29,6 +37,8 @@ class RaftServices(RaftNodeServicer):
             candidate_id=request.candidate_id,
             last_log_index=request.last_log_index,
             last_log_term=request.last_log_term,
+            pre_vote=request.pre_vote,
+            leadership_transfer=request.leadership_transfer,
         )
 
         return RequestVoteResponse(
@@ -37,29 +47,66 @@ class RaftServices(RaftNodeServicer):
         )
 
     async def AppendEntries(self, request: AppendEntriesRequest, context) -> AppendEntriesResponse:
-        term, success = self.node.on_append_entries(
+        return await self.node.on_append_entries(
             term=request.term,
             leader_id=request.leader_id,
             prev_log_index=request.prev_log_index,
             prev_log_term=request.prev_log_term,
             entries=list(request.entries),
             leader_commit=request.leader_commit,
+            heartbeat_interval_ms=request.heartbeat_interval_ms,
         )
 
-        return AppendEntriesResponse(
-            term=term,
-            success=success,
+    async def Replicate(self, request_iterator, context):
+        async for request in request_iterator:
+            yield await self.AppendEntries(request, context)
+
+    async def CatchUp(self, request_iterator, context) -> AppendEntriesResponse:
+        response = AppendEntriesResponse(term=self.node.current_term, success=True)
+        async for request in request_iterator:
+            response = await self.AppendEntries(request, context)
+            if not response.success:
+                break
+        return response
+
+    async def InstallSnapshot(
+        self, request: InstallSnapshotRequest, context
+    ) -> InstallSnapshotResponse:
+        term = self.node.on_install_snapshot(
+            term=request.term,
+            leader_id=request.leader_id,
+            snapshot=request.snapshot,
         )
+        return InstallSnapshotResponse(term=term)
+
+    async def ReadIndex(self, request: ReadIndexRequest, context) -> ReadIndexResponse:
+        read_index = await self.node.confirm_read_index(lease=request.lease)
+        if read_index is None:
+            return ReadIndexResponse(success=False)
+        return ReadIndexResponse(success=True, read_index=read_index)
+
+    async def TimeoutNow(self, request: TimeoutNowRequest, context) -> TimeoutNowResponse:
+        term, success = await self.node.on_timeout_now(
+            term=request.term, leader_id=request.leader_id
+        )
+        return TimeoutNowResponse(term=term, success=success)
 
     async def HealthCheck(self, request: HealthCheckRequest, context) -> HealthCheckResponse:
         return HealthCheckResponse(node_id=self.node.node_id, status="ok")
 
     async def SubmitPixel(self, request: SubmitPixelRequest, context) -> SubmitPixelResponse:
-        await self.node.submit_pixel(request.x, request.y, request.color)
-        return SubmitPixelResponse(success=True)
+        index = await self.node.submit_pixel(request.x, request.y, request.color)
+        if index is None:
+            return SubmitPixelResponse(success=False)
+        return SubmitPixelResponse(success=True, index=index)
+
+    async def Forward(self, request_iterator, context):
+        async for response in serve_forwarded(self.node, request_iterator):
+            yield response
 
 
 async def run_grpc_server(raft_node: RaftNode) -> grpc.Server:
+    message_bytes = max_message_bytes(raft_node.canvas.size)
     options = [
         ("grpc.keepalive_time_ms", 60000),
         ("grpc.keepalive_timeout_ms", 15000),
@@ -67,6 +114,8 @@ async def run_grpc_server(raft_node: RaftNode) -> grpc.Server:
         ("grpc.http2.max_pings_without_data", 0),
         ("grpc.http2.min_time_between_pings_ms", 30000),
         ("grpc.http2.min_ping_interval_without_data_ms", 300000),
+        ("grpc.max_send_message_length", message_bytes),
+        ("grpc.max_receive_message_length", message_bytes),
     ]
 
     server = grpc.server(options=options)
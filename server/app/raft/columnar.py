@@ -0,0 +1,183 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from typing import cast
+
+from app.generated.grpc.messages_pb2 import EntryType, LogEntry
+from app.raft.log import RaftLog
+
+# Entry types held entirely in the columns, the others are kept whole in a side table
+COLUMN_TYPES = (EntryType.PIXEL, EntryType.NOOP)
+
+
+class LogView:
+    """Zero-copy view over a run of entries of a ColumnarRaftLog.
+
+    The columns are memoryviews straight into the log's arrays. A Python array cannot
+    grow while it is exported, so a view has to be released before the log is appended
+    to again; use it as a context manager. Entries that do not fit the columns, such as
+    pixel batches, are looked up in `extras` by index.
+    """
+
+    def __init__(
+        self,
+        first_index: int,
+        terms: memoryview,
+        xs: memoryview,
+        ys: memoryview,
+        colors: memoryview,
+        types: memoryview,
+        extras: dict[int, LogEntry] | None = None,
+    ):
+        self.first_index = first_index
+        self.terms = terms
+        self.xs = xs
+        self.ys = ys
+        self.colors = colors
+        self.types = types
+        self.extras = extras or {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __enter__(self) -> "LogView":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def release(self):
+        for column in (self.terms, self.xs, self.ys, self.colors, self.types):
+            column.release()
+
+    def entries(self) -> list[LogEntry]:
+        entries = [
+            LogEntry(
+                term=term,
+                index=self.first_index + pos,
+                x=x,
+                y=y,
+                color=color,
+                type=cast(EntryType, entry_type),
+            )
+            for pos, (term, x, y, color, entry_type) in enumerate(
+                zip(self.terms, self.xs, self.ys, self.colors, self.types, strict=True)
+            )
+        ]
+        for index, entry in self.extras.items():
+            pos = index - self.first_index
+            if 0 <= pos < len(entries):
+                entries[pos] = entry
+        return entries
+
+
+class ColumnarRaftLog(RaftLog):
+    """RaftLog keeping entries in parallel int64 arrays instead of LogEntry objects.
+
+    An entry costs four machine words and a type byte rather than a protobuf object, the
+    index is implied by position, and truncation only moves the logical end of the
+    columns, the slots being overwritten by later appends. LogEntry messages are only
+    built when entries are read, which in practice is at the gRPC boundary. Entries
+    carrying more than the columns hold, pixel batches and membership changes, are also
+    kept whole in a side table keyed by index.
+    """
+
+    def _reset(self, entries: list[LogEntry]) -> None:
+        self._terms = array("q", (e.term for e in entries))
+        self._xs = array("q", (e.x for e in entries))
+        self._ys = array("q", (e.y for e in entries))
+        self._colors = array("q", (e.color for e in entries))
+        self._types = array("b", (e.type for e in entries))
+        self._extras = {e.index: e for e in entries if e.type not in COLUMN_TYPES}
+        self._length = len(entries)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _push(self, entry: LogEntry) -> None:
+        pos = self._length
+        if pos < len(self._terms):
+            self._terms[pos] = entry.term
+            self._xs[pos] = entry.x
+            self._ys[pos] = entry.y
+            self._colors[pos] = entry.color
+            self._types[pos] = entry.type
+        else:
+            self._terms.append(entry.term)
+            self._xs.append(entry.x)
+            self._ys.append(entry.y)
+            self._colors.append(entry.color)
+            self._types.append(entry.type)
+        if entry.type not in COLUMN_TYPES:
+            self._extras[entry.index] = entry
+        self._length += 1
+
+    def _discard_suffix(self, pos: int) -> None:
+        self._length = min(self._length, pos)
+        self._drop_extras(lambda index: index > self.snapshot_index + pos)
+
+    def _discard_prefix(self, count: int) -> None:
+        count = min(count, self._length)
+        for column in (self._terms, self._xs, self._ys, self._colors, self._types):
+            del column[:count]
+        self._length -= count
+        self._drop_extras(lambda index: index <= self.snapshot_index + count)
+
+    def _drop_extras(self, predicate: Callable[[int], bool]) -> None:
+        for index in [index for index in self._extras if predicate(index)]:
+            del self._extras[index]
+
+    def _entry(self, pos: int) -> LogEntry:
+        extra = self._extras.get(self.snapshot_index + pos + 1)
+        if extra is not None:
+            return extra
+        return LogEntry(
+            term=self._terms[pos],
+            index=self.snapshot_index + pos + 1,
+            x=self._xs[pos],
+            y=self._ys[pos],
+            color=self._colors[pos],
+            type=cast(EntryType, self._types[pos]),
+        )
+
+    def _slice(self, start: int, stop: int) -> list[LogEntry]:
+        with self._view(start, stop) as view:
+            return view.entries()
+
+    def _term(self, pos: int) -> int:
+        return self._terms[pos]
+
+    def _bisect_term(self, term: int, right: bool) -> int:
+        bisect = bisect_right if right else bisect_left
+        return bisect(self._terms, term, 0, self._length)
+
+    def pixel_changes(self, start: int, stop: int) -> list[tuple[int, int, int]]:
+        # Read off the columns, only pixel batches are looked up whole
+        changes: list[tuple[int, int, int]] = []
+        with self.view(start, stop) as view:
+            columns = zip(view.types, view.xs, view.ys, view.colors, strict=True)
+            for index, (entry_type, x, y, color) in enumerate(columns, view.first_index):
+                if entry_type == EntryType.PIXEL:
+                    changes.append((x, y, color))
+                elif entry_type == EntryType.PIXELS:
+                    entry = view.extras[index]
+                    changes.extend(zip(entry.xs, entry.ys, entry.colors, strict=True))
+        return changes
+
+    def view(self, start: int, stop: int) -> LogView:
+        """Zero-copy view of the entries at indexes `start` to `stop` inclusive"""
+        offset = self.snapshot_index + 1
+        start = max(start - offset, 0)
+        stop = min(stop - offset + 1, self._length)
+        return self._view(start, max(start, stop))
+
+    def _view(self, start: int, stop: int) -> LogView:
+        return LogView(
+            self.snapshot_index + start + 1,
+            memoryview(self._terms)[start:stop],
+            memoryview(self._xs)[start:stop],
+            memoryview(self._ys)[start:stop],
+            memoryview(self._colors)[start:stop],
+            memoryview(self._types)[start:stop],
+            self._extras,
+        )
@@ -0,0 +1,76 @@
+from app.generated.grpc.messages_pb2 import AppendEntriesRequest, LogEntry
+from app.raft.log import RaftLog
+
+# Key of the `entries` field of an AppendEntriesRequest, a length-delimited field
+ENTRIES_KEY = bytes([AppendEntriesRequest.DESCRIPTOR.fields_by_name["entries"].number << 3 | 2])
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_entry(entry: LogEntry) -> bytes:
+    """`entry` as an `entries` field of an AppendEntriesRequest. Protobuf merges repeated
+    fields by concatenation, so a run of these appended to an encoded request without
+    entries is the encoded request with those entries"""
+    data = entry.SerializeToString()
+    return ENTRIES_KEY + encode_varint(len(data)) + data
+
+
+class EntryEncoder:
+    """Leader-side cache of log entries already encoded for AppendEntries.
+
+    Every entry is serialized once per term and the bytes reused for every follower and
+    every retry. Entries are evicted once all followers have matched them, and at most
+    MAX_CACHED_ENTRIES are kept, so a follower that is down cannot pin the whole log;
+    the entries it needs are encoded again when it returns.
+    """
+
+    MAX_CACHED_ENTRIES = 65_536
+
+    def __init__(self, log: RaftLog):
+        self.log = log
+        self._encoded: dict[int, bytes] = {}
+        self._evicted_through = 0
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def encode_from(self, index: int, max_entries: int, max_bytes: int) -> tuple[int, bytes]:
+        """Entries starting at `index` encoded back to back, capped by count and by size
+        like RaftLog.entries_from(). Returns how many entries the bytes hold"""
+        stop = min(self.log.last_index, index + max_entries - 1)
+        records: list[bytes] = []
+        size = 0
+        for i in range(index, stop + 1):
+            record = self._encoded.get(i)
+            if record is None:
+                record = encode_entry(self.log[i])
+                if i > self._evicted_through:
+                    self._cache(i, record)
+            if records and size + len(record) > max_bytes:
+                break
+            records.append(record)
+            size += len(record)
+        return len(records), b"".join(records)
+
+    def evict_through(self, index: int):
+        """Drop the entries up to `index`, which every follower has stored"""
+        if index <= self._evicted_through:
+            return
+        self._evicted_through = index
+        encoded = self._encoded
+        # Entries are cached in index order, except those re-encoded for a lagging
+        # follower, which are left for the size cap to evict
+        while encoded and (first := next(iter(encoded))) <= index:
+            del encoded[first]
+
+    def _cache(self, index: int, record: bytes):
+        self._encoded[index] = record
+        if len(self._encoded) > self.MAX_CACHED_ENTRIES:
+            del self._encoded[next(iter(self._encoded))]
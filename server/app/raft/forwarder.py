@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import itertools
+import logging
+from typing import TYPE_CHECKING
+
+import grpc.aio as grpc
+
+from app.generated.grpc.messages_pb2 import (
+    ForwardedWrite,
+    ForwardRequest,
+    ForwardResponse,
+    ForwardResult,
+)
+
+if TYPE_CHECKING:
+    from app.raft.node import RaftNode
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderForwarder:
+    """Forwards the writes a follower receives to the leader over one long-lived stream.
+
+    Each write is tagged with an id and queued. A single writer task drains the queue
+    into ForwardRequest messages, so writes arriving together share a message, and a
+    reader task resolves each write from the results the leader streams back.
+
+    The stream follows `node.leader_id`: it is reopened to the new leader on the next
+    write after a change, and writes still in flight on the old stream fail, as the
+    unary call to a leader that stepped down would have.
+    """
+
+    SUBMIT_TIMEOUT = 5.0
+    MAX_WRITES_PER_MESSAGE = 256
+    # Well under gRPC's default 4 MB limit on a received message
+    MAX_BYTES_PER_MESSAGE = 1 << 20
+
+    def __init__(self, node: RaftNode):
+        self.node = node
+        self._ids = itertools.count(1)
+        self._queue: list[ForwardedWrite] = []
+        self._pending: dict[int, asyncio.Future[int | None]] = {}
+        self._wake_event = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+        # Stream to the current leader and the ids of the writes sent over it
+        self._target: str | None = None
+        self._call: grpc.StreamStreamCall | None = None
+        self._reader: asyncio.Task[None] | None = None
+        self._inflight: set[int] = set()
+
+    async def submit(self, xs: list[int], ys: list[int], colors: list[int]) -> int | None:
+        """Have the leader commit a write, returning its log index, or None if it could
+        not be committed within SUBMIT_TIMEOUT"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        write_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[write_id] = future
+        self._queue.append(ForwardedWrite(id=write_id, xs=xs, ys=ys, colors=colors))
+        self._wake_event.set()
+        try:
+            return await asyncio.wait_for(future, timeout=self.SUBMIT_TIMEOUT)
+        except TimeoutError:
+            logger.debug(f"Node {self.node.node_id}: forwarded write {write_id} timed out")
+            return None
+        finally:
+            self._pending.pop(write_id, None)
+            self._inflight.discard(write_id)
+
+    def close(self):
+        """Close the stream, failing the writes in flight on it"""
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
+        if self._reader is not None and self._reader is not asyncio.current_task():
+            self._reader.cancel()
+        self._reader = None
+        self._target = None
+        for write_id in self._inflight:
+            self._resolve(write_id, None)
+        self._inflight.clear()
+
+    def stop(self):
+        self.close()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for write in self._queue:
+            self._resolve(write.id, None)
+        self._queue.clear()
+
+    def _resolve(self, write_id: int, index: int | None):
+        future = self._pending.get(write_id)
+        if future is not None and not future.done():
+            future.set_result(index)
+
+    def _open(self) -> bool:
+        leader_id = self.node.leader_id
+        leader_peer = self.node._get_peer(leader_id) if leader_id else None
+        if leader_peer is None:
+            logger.debug(f"Node {self.node.node_id}: no leader to forward writes to")
+            return False
+
+        logger.debug(f"Node {self.node.node_id}: opening forwarding stream to {leader_id}")
+        self._target = leader_id
+        self._call = self.node.grpc_client.forward(leader_peer)
+        self._reader = asyncio.create_task(self._read(self._call))
+        return True
+
+    async def _run(self):
+        try:
+            while True:
+                await self._wake_event.wait()
+                self._wake_event.clear()
+                while self._queue:
+                    if self._call is None or self._target != self.node.leader_id:
+                        self.close()
+                        if not self._open():
+                            for write in self._queue:
+                                self._resolve(write.id, None)
+                            self._queue.clear()
+                            break
+                    assert self._call is not None
+
+                    writes = self._next_writes()
+                    self._inflight.update(write.id for write in writes)
+                    try:
+                        await self._call.write(ForwardRequest(writes=writes))
+                    except Exception as e:
+                        logger.debug(f"Node {self.node.node_id}: forwarding stream failed: {e}")
+                        self.close()
+        finally:
+            self.close()
+
+    def _next_writes(self) -> list[ForwardedWrite]:
+        """Take the writes for the next message off the queue, capped by count and by
+        encoded size, and at least one even if it alone exceeds MAX_BYTES_PER_MESSAGE"""
+        count = size = 0
+        for write in self._queue[: self.MAX_WRITES_PER_MESSAGE]:
+            size += write.ByteSize()
+            if count > 0 and size > self.MAX_BYTES_PER_MESSAGE:
+                break
+            count += 1
+        writes = self._queue[:count]
+        del self._queue[:count]
+        return writes
+
+    async def _read(self, call: grpc.StreamStreamCall):
+        try:
+            async for response in call:
+                for result in response.results:
+                    self._inflight.discard(result.id)
+                    self._resolve(result.id, result.index if result.success else None)
+        except Exception as e:
+            logger.debug(f"Node {self.node.node_id}: forwarding stream closed: {e}")
+        finally:
+            if self._call is call:
+                self.close()
+
+
+async def serve_forwarded(
+    node: RaftNode, requests: AsyncIterator[ForwardRequest]
+) -> AsyncIterator[ForwardResponse]:
+    """Leader side of the forwarding stream: submit every write as it arrives and stream
+    the results back, batching those that complete together into one response"""
+    results: asyncio.Queue[ForwardResult | None] = asyncio.Queue()
+    submissions: set[asyncio.Task[None]] = set()
+
+    async def submit(write: ForwardedWrite):
+        if len(write.xs) == len(write.ys) == len(write.colors) == 1:
+            index = await node.submit_pixel(write.xs[0], write.ys[0], write.colors[0])
+        else:
+            index = await node.submit_pixels(list(write.xs), list(write.ys), list(write.colors))
+        results.put_nowait(ForwardResult(id=write.id, success=index is not None, index=index or 0))
+
+    async def read():
+        async for request in requests:
+            for write in request.writes:
+                task = asyncio.create_task(submit(write))
+                submissions.add(task)
+                task.add_done_callback(submissions.discard)
+        # The follower closed its side, answer what it already sent before ending
+        while submissions:
+            await asyncio.wait(set(submissions))
+        results.put_nowait(None)
+
+    reader = asyncio.create_task(read())
+    try:
+        while (result := await results.get()) is not None:
+            batch = [result]
+            while not results.empty() and (result := results.get_nowait()) is not None:
+                batch.append(result)
+            yield ForwardResponse(results=batch)
+            if result is None:
+                break
+    finally:
+        # Submissions already in the log are left to commit, only their answers are lost
+        reader.cancel()
@@ -1,15 +1,34 @@
+import asyncio
+from bisect import bisect_left, bisect_right
 from typing import overload
 
-from app.generated.grpc.messages_pb2 import LogEntry
+from app.generated.grpc.messages_pb2 import ClusterConfig, EntryType, LogEntry, Snapshot
+from app.raft.storage import LogStorage
 
 
 class RaftLog:
-    """One indexed raft log"""
+    """One indexed raft log, kept in memory and optionally persisted through a LogStorage.
 
-    def __init__(self):
-        self._entries: list[LogEntry] = []
+    Entries covered by the latest snapshot are discarded, so the log holds indexes
+    `snapshot_index + 1 .. last_index` only.
+    """
+
+    def __init__(self, storage: LogStorage | None = None):
+        self.storage = storage
+        self.snapshot: Snapshot | None = None
+        entries: list[LogEntry] = []
+        if storage is not None:
+            self.snapshot, entries = storage.load()
+        self._reset(entries)
+        self._durable_index = self.last_index
+        # Bumped whenever stored entries are dropped, so that a sync started before
+        # does not vouch for the entries appended in their place
+        self._rewrites = 0
+        # Indexes of the retained CONFIG entries, the latest one defines the membership
+        self._config_indexes = [e.index for e in entries if e.type == EntryType.CONFIG]
 
     def __len__(self) -> int:
+        """Number of entries retained after the snapshot"""
         return len(self._entries)
 
     @overload
@@ -19,31 +38,192 @@ class RaftLog:
     def __getitem__(self, index: slice) -> list[LogEntry]: ...
 
     def __getitem__(self, index: int | slice) -> LogEntry | list[LogEntry]:
+        offset = self.snapshot_index + 1
         if isinstance(index, int):
-            return self._entries[index - 1]
+            if index < offset or index > self.last_index:
+                raise IndexError(f"Log index {index} is not in the log")
+            return self._entry(index - offset)
         if isinstance(index, slice):
-            start = (index.start - 1) if index.start is not None else None
-            stop = (index.stop) if index.stop is not None else None
-            return self._entries[start:stop]
+            start = max(index.start - offset, 0) if index.start is not None else 0
+            stop = max(index.stop - offset + 1, 0) if index.stop is not None else len(self)
+            return self._slice(start, min(stop, len(self)))
+
+    def entries_from(self, index: int, max_entries: int, max_bytes: int) -> list[LogEntry]:
+        """Entries starting at `index`, capped by count and by encoded size. At least one
+        entry is returned when any exist, even if it alone exceeds `max_bytes`"""
+        start = index - self.snapshot_index - 1
+        entries = self._slice(start, min(len(self), start + max_entries))
+        size = 0
+        for count, entry in enumerate(entries):
+            size += entry.ByteSize()
+            if count > 0 and size > max_bytes:
+                return entries[:count]
+        return entries
+
+    def pixel_changes(self, start: int, stop: int) -> list[tuple[int, int, int]]:
+        """(x, y, color) of every pixel written by the entries at indexes `start` to
+        `stop` inclusive, in log order"""
+        changes: list[tuple[int, int, int]] = []
+        for entry in self[start:stop]:
+            if entry.type == EntryType.PIXEL:
+                changes.append((entry.x, entry.y, entry.color))
+            elif entry.type == EntryType.PIXELS:
+                changes.extend(zip(entry.xs, entry.ys, entry.colors, strict=True))
+        return changes
 
     def append(self, entry: LogEntry) -> None:
-        self._entries.append(entry)
+        self._push(entry)
+        if entry.type == EntryType.CONFIG:
+            self._config_indexes.append(entry.index)
+        if self.storage is not None:
+            self.storage.append([entry])
 
     def truncate_from(self, index: int) -> None:
-        if index <= len(self._entries) + 1:
-            self._entries = self._entries[: index - 1]
+        index = max(index, self.snapshot_index + 1)
+        if index <= self.last_index + 1:
+            self._discard_suffix(index - self.snapshot_index - 1)
+            del self._config_indexes[bisect_left(self._config_indexes, index) :]
+            if self.storage is not None:
+                self.storage.truncate_from(index)
+                self._durable_index = min(self._durable_index, index - 1)
+                self._rewrites += 1
+
+    def compact(self, snapshot: Snapshot) -> None:
+        """Replace every entry up to the snapshot's last included index with the snapshot.
+
+        Entries after it are kept if the log agrees with the snapshot at that index,
+        otherwise the whole log is discarded, as when a follower installs a snapshot sent
+        by the leader.
+        """
+        index = snapshot.last_included_index
+        keep_suffix = self.term_at(index) == snapshot.last_included_term
+        self._discard_prefix(
+            index - self.snapshot_index if keep_suffix else self.last_index - self.snapshot_index
+        )
+        self.snapshot = snapshot
+        # The snapshot carries the membership as of its last included entry
+        if keep_suffix:
+            del self._config_indexes[: bisect_right(self._config_indexes, index)]
+        else:
+            self._config_indexes.clear()
+
+        if self.storage is not None:
+            # Persist the snapshot before dropping any record it replaces
+            self.storage.save_snapshot(snapshot)
+            if not keep_suffix:
+                self.storage.truncate_from(index + 1)
+                self._rewrites += 1
+            self._durable_index = max(min(self._durable_index, self.last_index), index)
+
+    # In-memory layout, positions are 0-based offsets from the first retained entry
+
+    def _reset(self, entries: list[LogEntry]) -> None:
+        self._entries = entries
+
+    def _push(self, entry: LogEntry) -> None:
+        self._entries.append(entry)
+
+    def _discard_suffix(self, pos: int) -> None:
+        del self._entries[pos:]
+
+    def _discard_prefix(self, count: int) -> None:
+        del self._entries[:count]
+
+    def _entry(self, pos: int) -> LogEntry:
+        return self._entries[pos]
+
+    def _slice(self, start: int, stop: int) -> list[LogEntry]:
+        return self._entries[start:stop]
+
+    def _term(self, pos: int) -> int:
+        return self._entries[pos].term
+
+    def _bisect_term(self, term: int, right: bool) -> int:
+        """Position of the first retained entry with a term above (right) or at least
+        (left) `term`"""
+        bisect = bisect_right if right else bisect_left
+        return bisect(self._entries, term, key=lambda e: e.term)
+
+    def config_at(self, index: int) -> ClusterConfig | None:
+        """Membership in effect at `index`, None if it was never changed"""
+        pos = bisect_right(self._config_indexes, index)
+        if pos:
+            return self[self._config_indexes[pos - 1]].config
+        if self.snapshot is not None and self.snapshot.HasField("config"):
+            return self.snapshot.config
+        return None
+
+    @property
+    def config_index(self) -> int:
+        """Index of the entry, or snapshot, holding the latest membership, 0 for none"""
+        if self._config_indexes:
+            return self._config_indexes[-1]
+        if self.snapshot is not None and self.snapshot.HasField("config"):
+            return self.snapshot_index
+        return 0
+
+    async def sync(self) -> None:
+        """Make every appended entry durable, one flush for the whole batch. The flush runs
+        on a worker thread, entries appended meanwhile are left to the next sync"""
+        if self.storage is None or self._durable_index == self.last_index:
+            return
+        index, rewrites = self.last_index, self._rewrites
+        await asyncio.to_thread(self.storage.sync)
+        if self._rewrites == rewrites:
+            self._durable_index = max(self._durable_index, index)
+
+    @property
+    def durable_index(self) -> int:
+        if self.storage is None:
+            return self.last_index
+        return self._durable_index
+
+    def load_hard_state(self) -> tuple[int, str | None]:
+        if self.storage is None:
+            return 0, None
+        return self.storage.load_hard_state()
+
+    def save_hard_state(self, term: int, voted_for: str | None) -> None:
+        if self.storage is not None:
+            self.storage.save_hard_state(term, voted_for)
+
+    @property
+    def snapshot_index(self) -> int:
+        return self.snapshot.last_included_index if self.snapshot is not None else 0
+
+    @property
+    def snapshot_term(self) -> int:
+        return self.snapshot.last_included_term if self.snapshot is not None else 0
 
     @property
     def last_index(self) -> int:
-        return len(self._entries)
+        return self.snapshot_index + len(self)
 
     @property
     def last_term(self) -> int:
-        if not self._entries:
-            return 0
-        return self._entries[-1].term
+        if not len(self):
+            return self.snapshot_term
+        return self._term(len(self) - 1)
 
     def term_at(self, index: int) -> int:
-        if index < 1 or index > len(self._entries):
+        if index == self.snapshot_index:
+            return self.snapshot_term
+        if index < self.snapshot_index + 1 or index > self.last_index:
             return 0
-        return self._entries[index - 1].term
+        return self._term(index - self.snapshot_index - 1)
+
+    def first_index_of_term(self, term: int) -> int:
+        """First retained index holding `term`, or 0 if the term is not in the log"""
+        pos = self._bisect_term(term, right=False)
+        if pos < len(self) and self._term(pos) == term:
+            return self.snapshot_index + pos + 1
+        return 0
+
+    def last_index_of_term(self, term: int) -> int:
+        """Last index holding `term`, or 0 if the term is not in the log"""
+        pos = self._bisect_term(term, right=True)
+        if pos > 0 and self._term(pos - 1) == term:
+            return self.snapshot_index + pos
+        if term == self.snapshot_term and self.snapshot is not None:
+            return self.snapshot_index
+        return 0
@@ -2,14 +2,29 @@ from __future__ import annotations
 
 import asyncio
 from enum import Enum
+import heapq
+import itertools
 import logging
 import random
+import zlib
 
+from app.canvas.encoding import CanvasEncoding, encode_canvas_in_thread
 from app.canvas.state import Canvas
-from app.generated.grpc.messages_pb2 import LogEntry
-from app.grpc.client import RaftClient
+from app.generated.grpc.messages_pb2 import (
+    AppendEntriesResponse,
+    ClusterConfig,
+    EntryType,
+    LogEntry,
+    Member,
+    Snapshot,
+    SnapshotEncoding,
+)
+from app.grpc.client import RaftClient, max_message_bytes
+from app.raft.encoding import EntryEncoder
+from app.raft.forwarder import LeaderForwarder
 from app.raft.log import RaftLog
-from app.schemas import PeerNode
+from app.raft.replicator import PeerReplicator
+from app.schemas import MAX_COLOR, MAX_PIXELS_PER_BATCH, PeerNode
 
 logger = logging.getLogger(__name__)
 
@@ -20,41 +35,154 @@ class Role(Enum):
     LEADER = "leader"
 
 
+def member_to_peer(member: Member) -> PeerNode:
+    return PeerNode(
+        node_id=member.node_id,
+        host=member.host,
+        http_port=member.http_port,
+        grpc_port=member.grpc_port,
+        learner=member.learner,
+    )
+
+
+def peer_to_member(peer: PeerNode) -> Member:
+    return Member(
+        node_id=peer.node_id,
+        host=peer.host,
+        http_port=peer.http_port,
+        grpc_port=peer.grpc_port,
+        learner=peer.learner,
+    )
+
+
 class RaftNode:
-    # Timeout configuration
+    # Timeout configuration. The leader sends heartbeats every HEARTBEAT_RTT_MULTIPLE
+    # round trips to the nearest majority of followers, within HEARTBEAT_INTERVAL_MIN and
+    # HEARTBEAT_INTERVAL, and advertises that interval in AppendEntries. A follower's
+    # election timeout is then ELECTION_TIMEOUT_HEARTBEATS missed heartbeats, stretched at
+    # random by up to ELECTION_TIMEOUT_MAX / ELECTION_TIMEOUT_MIN. The MIN and MAX bounds
+    # apply until a leader has been heard from, and cap the derived timeouts. Derived
+    # timeouts never go below ELECTION_TIMEOUT_FLOOR, a margin for the event loop stalls
+    # left once canvas encodes and log syncs moved to worker threads
     ELECTION_TIMEOUT_MIN = 2.0
     ELECTION_TIMEOUT_MAX = 4.0
+    ELECTION_TIMEOUT_FLOOR = 0.4
     HEARTBEAT_INTERVAL = 0.5
+    HEARTBEAT_INTERVAL_MIN = 0.05
+    HEARTBEAT_RTT_MULTIPLE = 10
+    ELECTION_TIMEOUT_HEARTBEATS = 6
     COMMIT_TIMEOUT = 30.0
-    FOLLOWER_CHECK_INTERVAL = 0.5
 
-    def __init__(self, node_id: str, peers: list[PeerNode], canvas: Canvas):
+    # Group commit: how long the leader lingers after the first new entry so that
+    # concurrent submissions ship in the same AppendEntries round, and how many
+    # unsent entries cut the linger short
+    BATCH_LINGER = 0.002
+    BATCH_MAX_ENTRIES = 256
+
+    # Applied entries retained in the log before the canvas is snapshotted and the log
+    # prefix discarded. The leader holds the snapshot back until every follower has
+    # matched it, so one slightly behind is sent entries rather than the whole canvas,
+    # but for no more than SNAPSHOT_THRESHOLD further entries
+    SNAPSHOT_THRESHOLD = 10_000
+
+    # Linearizable reads: how long a read may wait for leadership to be confirmed and the
+    # read index applied. After a majority acknowledged a heartbeat the leader may serve
+    # reads without confirming again for LEASE_RATIO of the shortest election timeout it
+    # has advertised, followers refuse votes until that timeout has passed since they
+    # last heard from it and the margin absorbs clock drift
+    READ_TIMEOUT = 2.0
+    LEASE_RATIO = 0.8
+
+    # Leadership transfer: the longest submissions are held back while the leader brings
+    # the target up to date and waits for it to take over
+    TRANSFER_TIMEOUT = ELECTION_TIMEOUT_MIN
+
+    # Membership changes: how long a node being added may take to catch up as a learner
+    # before it is promoted to voter
+    MEMBER_CATCH_UP_TIMEOUT = 30.0
+
+    def __init__(
+        self,
+        node_id: str,
+        peers: list[PeerNode],
+        canvas: Canvas,
+        log: RaftLog | None = None,
+        learner: bool = False,
+        member: PeerNode | None = None,
+        stream_replication: bool = False,
+    ):
         self.canvas = canvas
-        self.grpc_client = RaftClient(node_id)
+        self.grpc_client = RaftClient(
+            node_id,
+            stream_replication=stream_replication,
+            max_message_bytes=max_message_bytes(canvas.size),
+        )
+        # Writes received while following are sent to the leader over a single stream
+        self.forwarder = LeaderForwarder(self)
 
         self.node_id = node_id
         self.role = Role.FOLLOWER
         self.leader_id: str | None = None
+        # A learner follows the log and serves reads but never votes or stands for election
+        self.learner = learner
+        # Address this node is reached at, as listed in the cluster membership
+        self.member = member or PeerNode(node_id=node_id, host=node_id, http_port=0, grpc_port=0)
+        self.member = self.member.model_copy(update={"learner": learner})
 
         # Persistent for all
-        self.current_term = 0
-        self.voted_for: str | None = None
-        self.log = RaftLog()
+        self.log = log if log is not None else RaftLog()
+        self.current_term, self.voted_for = self.log.load_hard_state()
 
         # Volatile for all
         self.commit_index = 0
         self.last_applied = 0
         self.peers = peers
+        self._members = [self.member, *peers]
+        # Membership the node was started with, in effect until the log changes it
+        self._initial_members = self._members
+        self._apply_waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._apply_waiter_ids = itertools.count()
+
+        if self.log.snapshot is not None:
+            self._restore_snapshot(self.log.snapshot)
 
         # Volatile for leaders
         self.next_index: dict[str, int] | None = None
         self.match_index: dict[str, int] | None = None
         self._pending_commits: dict[int, asyncio.Future[bool]] | None = None
+        self._replicators: dict[str, PeerReplicator] = {}
+        self._replicating = False
+        # Entries encoded once for all followers, for the duration of a term
+        self.entry_encoder: EntryEncoder | None = None
+        self._stepped_down_event = asyncio.Event()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._unsent_entries = 0
+        self._sync_tasks: set[asyncio.Task[None]] = set()
+        self._snapshot_task: asyncio.Task[None] | None = None
+        self._pending_snapshot: Snapshot | None = None
+        self._term_start_index = 0
+        self._ack_event = asyncio.Event()
+        self._leader_since = 0.0
+        self._transfer_done = asyncio.Event()
+        self._transfer_done.set()
+        # Term in which this node told a follower to take over. Its vote bypasses the
+        # lease, so the lease is not honored again for the rest of that term
+        self._lease_revoked_term = 0
+        self._leader_contact_event = asyncio.Event()
 
-        self._election_timeout = random.uniform(
-            self.ELECTION_TIMEOUT_MIN, self.ELECTION_TIMEOUT_MAX
-        )
+        self._min_heartbeat_interval = self.HEARTBEAT_INTERVAL
+        self._elected_event = asyncio.Event()
+
+        # Shortest election timeout, derived from the heartbeat interval the leader
+        # advertises, and the randomized timeout currently running
+        self._election_timeout_min = self.ELECTION_TIMEOUT_MIN
+        self._election_timeout = self._random_election_timeout()
         self._last_heartbeat = asyncio.get_event_loop().time()
+        # A node that just started may have acknowledged a leader before going down, so
+        # it treats startup as leader contact when deciding whether to vote
+        self._leader_contact = self._last_heartbeat
+
+        self._reload_config()
 
     async def start(self):
         logger.debug(f"Node {self.node_id}: called start()")
@@ -66,121 +194,294 @@ class RaftNode:
 
     async def _follower_candidate_loop(self):
         logger.debug(f"Node {self.node_id}: called _follower_candidate_loop()")
+        loop = asyncio.get_running_loop()
         while self.role in (Role.FOLLOWER, Role.CANDIDATE):
-            now = asyncio.get_event_loop().time()
-            elapsed = now - self._last_heartbeat
+            self._elected_event.clear()
+            remaining: float | None = None
+            if not self.learner:
+                remaining = self._last_heartbeat + self._election_timeout - loop.time()
+                if remaining <= 0:
+                    await self._start_election()
+                    continue
+
+            # Heartbeats push the deadline back without waking us, it is re-read when the
+            # timer fires. Winning an election started elsewhere, on TimeoutNow, wakes us
+            try:
+                await asyncio.wait_for(self._elected_event.wait(), timeout=remaining)
+            except TimeoutError:
+                pass
+
+    def _random_election_timeout(self) -> float:
+        spread = self.ELECTION_TIMEOUT_MAX / self.ELECTION_TIMEOUT_MIN
+        return random.uniform(self._election_timeout_min, self._election_timeout_min * spread)
 
-            if elapsed >= self._election_timeout:
-                await self._start_election()
+    def _election_timeout_for(self, heartbeat_interval: float) -> float:
+        timeout = self.ELECTION_TIMEOUT_HEARTBEATS * heartbeat_interval
+        return min(max(timeout, self.ELECTION_TIMEOUT_FLOOR), self.ELECTION_TIMEOUT_MIN)
 
-            await asyncio.sleep(self.FOLLOWER_CHECK_INTERVAL)
+    @property
+    def heartbeat_interval(self) -> float:
+        """Heartbeat period of this leader, derived from the round-trip times its
+        replicators measure"""
+        needed = self._majority() - (0 if self.learner else 1)
+        rtts = sorted(
+            r.rtt for r in self._replicators.values() if r.rtt is not None and not r.peer.learner
+        )
+        if needed == 0 or len(rtts) < needed:
+            return self.HEARTBEAT_INTERVAL
+        interval = rtts[needed - 1] * self.HEARTBEAT_RTT_MULTIPLE
+        return min(max(interval, self.HEARTBEAT_INTERVAL_MIN), self.HEARTBEAT_INTERVAL)
+
+    def _advertise_heartbeat_interval(self) -> int:
+        """Heartbeat interval in milliseconds to put in an AppendEntries"""
+        interval_ms = max(1, round(self.heartbeat_interval * 1000))
+        self._min_heartbeat_interval = min(self._min_heartbeat_interval, interval_ms / 1000)
+        return interval_ms
+
+    def _lease_duration(self) -> float:
+        return self.LEASE_RATIO * self._election_timeout_for(self._min_heartbeat_interval)
 
     async def _leader_loop(self):
         logger.debug(f"Node {self.node_id}: called _leader_loop()")
-        while self.role == Role.LEADER:
-            await self._send_heartbeats()
-            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+        self._start_replicators()
+        try:
+            while self.role == Role.LEADER:
+                try:
+                    await asyncio.wait_for(
+                        self._stepped_down_event.wait(), timeout=self.heartbeat_interval
+                    )
+                except TimeoutError:
+                    self._check_quorum()
+        finally:
+            self._stop_replicators()
+
+    def _check_quorum(self):
+        """Step down once a majority has gone quiet for an election timeout. A leader cut
+        off from the cluster would otherwise keep taking writes it can never commit"""
+        last_quorum = max(self._quorum_ack_time(), self._leader_since)
+        timeout = self._election_timeout_for(self.heartbeat_interval)
+        if asyncio.get_running_loop().time() - last_quorum >= timeout:
+            logger.info(f"Node {self.node_id}: lost contact with a majority, stepping down")
+            self.leader_id = None
+            self._become_follower(self.current_term)
+
+    def _start_replicators(self):
+        self._stop_replicators()
+        self._replicating = True
+        self._sync_replicators()
+
+    def _stop_replicators(self):
+        self._replicating = False
+        for replicator in self._replicators.values():
+            replicator.stop()
+        self._replicators.clear()
+
+    def _sync_replicators(self):
+        """Run a replicator for every current peer, after the membership changed"""
+        if not self._replicating or self.next_index is None or self.match_index is None:
+            return
+        node_ids = {peer.node_id for peer in self.peers}
+        for node_id in [node_id for node_id in self._replicators if node_id not in node_ids]:
+            self._replicators.pop(node_id).stop()
+        for peer in self.peers:
+            self.next_index.setdefault(peer.node_id, self.log.last_index + 1)
+            self.match_index.setdefault(peer.node_id, 0)
+            replicator = self._replicators.get(peer.node_id)
+            if replicator is not None:
+                replicator.peer = peer
+                continue
+            replicator = PeerReplicator(self, peer)
+            self._replicators[peer.node_id] = replicator
+            replicator.start()
+
+    def _notify_new_entries(self, count: int = 1):
+        """Schedule replication of freshly appended entries, lingering briefly so that
+        concurrent submissions are shipped together"""
+        self._unsent_entries += count
+        if self._unsent_entries >= self.BATCH_MAX_ENTRIES or self.BATCH_LINGER <= 0:
+            self._flush_batch()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(
+                self.BATCH_LINGER, self._flush_batch
+            )
+
+    def _flush_batch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._unsent_entries = 0
+        # Followers are sent the entries while they are flushed to disk here
+        for replicator in self._replicators.values():
+            replicator.wake()
+        if self.log.durable_index < self.log.last_index:
+            task = asyncio.create_task(self._sync_log())
+            self._sync_tasks.add(task)
+            task.add_done_callback(self._sync_tasks.discard)
+        else:
+            self._try_advance_commit_index()
+
+    async def _sync_log(self):
+        """Count the leader's own entries towards commit once they are durable"""
+        await self.log.sync()
+        if self.role == Role.LEADER:
+            self._try_advance_commit_index()
+
+    def _persist_hard_state(self):
+        self.log.save_hard_state(self.current_term, self.voted_for)
+
+    async def _start_election(self, transfer: bool = False):
+        logger.debug(f"Node {self.node_id}: called _start_election(transfer={transfer})")
+        # Reset election
+        self._election_timeout = self._random_election_timeout()
+        self._last_heartbeat = asyncio.get_event_loop().time()
+
+        # An election asked for by the leader skips the pre-vote, which the leader's own
+        # followers would refuse
+        if not transfer and not await self._pre_vote():
+            return
 
-    async def _start_election(self):
-        logger.debug(f"Node {self.node_id}: called _start_election()")
         self.role = Role.CANDIDATE
         self.current_term += 1
         self.voted_for = self.node_id
+        self._persist_hard_state()
 
-        # Reset election
-        self._election_timeout = random.uniform(
-            self.ELECTION_TIMEOUT_MIN, self.ELECTION_TIMEOUT_MAX
-        )
-        self._last_heartbeat = asyncio.get_event_loop().time()
+        term = self.current_term
+        won = await self._request_votes(term, transfer=transfer)
+        if won and self.current_term == term and self.role == Role.CANDIDATE:
+            self._become_leader()
 
+    async def _pre_vote(self) -> bool:
+        """Ask the peers whether they would vote for us at the next term, without bumping
+        our own. A node that was partitioned away or paused cannot win, and so never
+        inflates its term and forces a healthy leader to step down when it rejoins"""
         term = self.current_term
+        started = self._last_heartbeat
+        won = await self._request_votes(term + 1, pre_vote=True)
+        if self.current_term != term or self.role == Role.LEADER:
+            return False
+        if self._leader_contact > started:
+            # A leader showed up while we were asking
+            return False
+        logger.debug(f"Node {self.node_id}: pre-vote for term {term + 1} won={won}")
+        return won
+
+    async def _request_votes(
+        self, term: int, pre_vote: bool = False, transfer: bool = False
+    ) -> bool:
+        """Ask every peer for its vote at `term`. Returns as soon as a majority has granted
+        it, so an unreachable peer never holds up an election it cannot change"""
+        majority = self._majority()
         votes = 1
+        if votes >= majority:
+            return True
 
         last_log_index = self.log.last_index
         last_log_term = self.log.last_term
-
-        if self.current_term != term or self.role != Role.CANDIDATE:
-            return
-
-        responses = await self.grpc_client.broadcast_request_votes(
-            self.peers, self.current_term, last_log_index, last_log_term
-        )
-
-        for response in responses:
-            if response.term > self.current_term:
-                self._become_follower(response.term)
-                return
-            if response.vote_granted:
-                votes += 1
-                continue
-
-        majority = (len(self.peers) + 1) // 2 + 1
-        if votes >= majority:
-            self._become_leader()
+        requests = [
+            asyncio.ensure_future(
+                self.grpc_client.request_vote(
+                    peer, term, last_log_index, last_log_term, pre_vote, transfer
+                )
+            )
+            for peer in self.voters
+        ]
+        try:
+            for next_response in asyncio.as_completed(requests):
+                try:
+                    response = await next_response
+                except Exception as e:
+                    logger.debug(f"Node {self.node_id}: request_vote failed: {e}")
+                    continue
+                if response.term > self.current_term and not response.vote_granted:
+                    self._become_follower(response.term)
+                    return False
+                if response.vote_granted:
+                    votes += 1
+                    if votes >= majority:
+                        return True
+            return False
+        finally:
+            for request in requests:
+                request.cancel()
 
     def _become_leader(self):
         logger.debug(f"Node {self.node_id}: called _become_leader()")
         self.role = Role.LEADER
         self.leader_id = self.node_id
+        self._leader_since = asyncio.get_event_loop().time()
+        self._min_heartbeat_interval = self.HEARTBEAT_INTERVAL
+        self._elected_event.set()
+        self.forwarder.close()
 
         self.next_index = {p.node_id: self.log.last_index + 1 for p in self.peers}
         self.match_index = {p.node_id: 0 for p in self.peers}
+        self.entry_encoder = EntryEncoder(self.log)
         self._pending_commits = {}
+        self._stepped_down_event.clear()
+
+        # The commit index is only known to be current once an entry of this term
+        # commits, so every term starts with a no-op
+        self._term_start_index = self.log.last_index + 1
+        self.log.append(
+            LogEntry(term=self.current_term, index=self._term_start_index, type=EntryType.NOOP)
+        )
+        self._notify_new_entries()
 
     def _become_follower(self, term: int):
         logger.debug(f"Node {self.node_id}: called _become_follower(term={term})")
         self.role = Role.FOLLOWER
-        self.current_term = term
-        self.voted_for = None
+        if term != self.current_term:
+            # The vote is only released when moving to a newer term, a candidate stepping
+            # down keeps its vote for the current one
+            self.current_term = term
+            self.voted_for = None
+            self.leader_id = None
+            self._persist_hard_state()
         self._last_heartbeat = asyncio.get_event_loop().time()
         self._pending_commits = None
         self.next_index = None
         self.match_index = None
+        self.entry_encoder = None
+        self._stop_replicators()
+        self._stepped_down_event.set()
+        self._ack_event.set()
 
-    async def _send_heartbeats(self):
-        logger.debug(f"Node {self.node_id}: called _send_heartbeats()")
-        logger.debug(f"Node {self.node_id}: match_index state: {self.match_index}")
-        tasks = [self._send_append_entries(peer) for peer in self.peers]
-        await asyncio.gather(*tasks, return_exceptions=True)
-        self._try_advance_commit_index()
-
-    async def _send_append_entries(self, peer: PeerNode):
-        logger.debug(f"Node {self.node_id}: called _send_append_entries(peer={peer.node_id})")
-        if self.role != Role.LEADER or self.next_index is None or self.match_index is None:
-            return
-
-        next_idx = self.next_index[peer.node_id]
-        prev_log_index = next_idx - 1
-        prev_log_term = self.log.term_at(prev_log_index)
-
-        entries = self.log[next_idx:]
+    @property
+    def voters(self) -> list[PeerNode]:
+        """Peers that vote and count towards the commit quorum"""
+        return [peer for peer in self.peers if not peer.learner]
 
-        try:
-            resp = await self.grpc_client.append_entries(
-                peer,
-                term=self.current_term,
-                leader_id=self.node_id,
-                prev_log_index=prev_log_index,
-                prev_log_term=prev_log_term,
-                entries=entries,
-                leader_commit=self.commit_index,
-            )
-            logger.debug(
-                f"Node {self.node_id}: append_entries to {peer.node_id} succeeded: term={resp.term}, success={resp.success}"
-            )
-        except Exception as e:
-            logger.debug(f"Node {self.node_id}: append_entries to {peer.node_id} failed: {e}")
-            return
+    def _majority(self) -> int:
+        """Votes or replicas needed for a quorum, this node included when it votes"""
+        return (len(self.voters) + (0 if self.learner else 1)) // 2 + 1
 
-        if resp.term > self.current_term:
-            self._become_follower(resp.term)
-            return
+    @property
+    def members(self) -> list[PeerNode]:
+        """Current cluster membership, this node included unless it was removed"""
+        return list(self._members)
 
-        if resp.success:
-            self.next_index[peer.node_id] = next_idx + len(entries)
-            self.match_index[peer.node_id] = self.next_index[peer.node_id] - 1
+    def _reload_config(self):
+        """Adopt the latest membership in the log, which takes effect as soon as it is
+        appended rather than once committed, or the initial one if it never changed"""
+        config = self.log.config_at(self.log.last_index)
+        if config is None:
+            members = self._initial_members
         else:
-            self.next_index[peer.node_id] = max(1, next_idx - 1)
+            members = [member_to_peer(member) for member in config.members]
+        self_member = next((m for m in members if m.node_id == self.node_id), None)
+        if self_member is not None:
+            self.member = self_member
+        # A node that is not a member keeps running, but like a learner never elects
+        learner = self_member is None or self_member.learner
+        promoted = self.learner and not learner
+
+        self._members = members
+        self.peers = [m for m in members if m.node_id != self.node_id]
+        self.learner = learner
+        if promoted:
+            # Wake the follower loop to arm the election timer
+            self._elected_event.set()
+        self._sync_replicators()
 
     def _get_peer(self, node_id: str) -> PeerNode | None:
         logger.debug(f"Node {self.node_id}: called _get_peer(node_id={node_id})")
@@ -193,43 +494,160 @@ class RaftNode:
         if self.role != Role.LEADER or self.match_index is None or self.next_index is None:
             return
 
-        for n in range(self.commit_index + 1, len(self.log) + 1):
-            if self.log.term_at(n) != self.current_term:
-                continue
+        # The highest index stored on a majority is the majority-th largest match index,
+        # counting what the leader has made durable itself
+        if self.entry_encoder is not None and self.peers:
+            self.entry_encoder.evict_through(
+                min(self.match_index.get(p.node_id, 0) for p in self.peers)
+            )
 
-            replicated = 1
-            replicated_peers = []
-            for peer in self.peers:
-                if self.match_index.get(peer.node_id, 0) >= n:
-                    replicated += 1
-                    replicated_peers.append(peer.node_id)
+        match_indexes = [self.match_index.get(p.node_id, 0) for p in self.voters]
+        if not self.learner:
+            match_indexes.append(self.log.durable_index)
+        match_indexes.sort(reverse=True)
+        if len(match_indexes) < self._majority():
+            return
+        n = match_indexes[self._majority() - 1]
 
-            majority = (len(self.peers) + 1) // 2 + 1
-            logger.debug(
-                f"Node {self.node_id}: index={n}, replicated={replicated}/{majority} (peers: {replicated_peers})"
-            )
-            if replicated >= majority:
-                self.commit_index = n
-                logger.debug(f"Node {self.node_id}: committed index {n}")
+        # Only entries from the current term are committed by counting replicas
+        if n > self.commit_index and self.log.term_at(n) == self.current_term:
+            self.commit_index = n
+            logger.debug(f"Node {self.node_id}: committed index {n}")
 
         self._apply_committed()
 
     def _apply_committed(self):
+        """Apply every committed entry not applied yet in one go, the canvas receiving
+        all of their pixels as a single change set"""
         logger.debug(f"Node {self.node_id}: called _apply_committed()")
-        while self.last_applied < self.commit_index:
-            self.last_applied += 1
-            entry = self.log[self.last_applied]
-            self.canvas.update(entry.x, entry.y, entry.color)
+        if self.last_applied >= self.commit_index:
+            return
+        start = self.last_applied + 1
+        changes = self.log.pixel_changes(start, self.commit_index)
+        # A leader that is no longer a voter hands over once its removal commits
+        removed = (
+            self.role == Role.LEADER
+            and self.learner
+            and start <= self.log.config_index <= self.commit_index
+        )
+        if self.role == Role.LEADER and self._pending_commits:
+            for index in range(start, self.commit_index + 1):
+                future = self._pending_commits.pop(index, None)
+                if future is not None and not future.done():
+                    future.set_result(True)
+
+        self.last_applied = self.commit_index
+        self.canvas.apply(changes, self.last_applied)
+
+        self._compact_log()
+        if (
+            self.last_applied - self.log.snapshot_index >= self.SNAPSHOT_THRESHOLD
+            and self._pending_snapshot is None
+            and (self._snapshot_task is None or self._snapshot_task.done())
+        ):
+            self._snapshot_task = asyncio.create_task(self._take_snapshot())
+        self._wake_apply_waiters()
+
+        if removed:
+            logger.info(f"Node {self.node_id}: removed from the voters, stepping down")
+            self.leader_id = None
+            self._become_follower(self.current_term)
+
+    def _wake_apply_waiters(self):
+        while self._apply_waiters and self._apply_waiters[0][0] <= self.last_applied:
+            _, _, future = heapq.heappop(self._apply_waiters)
+            if not future.done():
+                future.set_result(None)
+
+    async def wait_applied(self, index: int):
+        """Wait until the entry at `index` has been applied to the canvas"""
+        if self.last_applied >= index:
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._apply_waiters, (index, next(self._apply_waiter_ids), future))
+        await future
+
+    async def catch_up_to(self, index: int) -> bool:
+        """Wait up to READ_TIMEOUT for `index` to be applied, so that a client reading
+        from any node sees its own writes. False if this node is still behind"""
+        try:
+            async with asyncio.timeout(self.READ_TIMEOUT):
+                await self.wait_applied(index)
+            return True
+        except TimeoutError:
+            logger.debug(f"Node {self.node_id}: timed out catching up to index {index}")
+            return False
 
+    def _on_peer_ack(self):
+        self._ack_event.set()
+
+    def _quorum_ack_time(self) -> float:
+        """Send time of the latest heartbeat round a majority, the leader included,
+        has acknowledged"""
+        acks = [] if self.learner else [asyncio.get_running_loop().time()]
+        for peer in self.voters:
+            replicator = self._replicators.get(peer.node_id)
+            acks.append(replicator.last_ack if replicator is not None else 0.0)
+        acks.sort(reverse=True)
+        if len(acks) < self._majority():
+            return 0.0
+        return acks[self._majority() - 1]
+
+    def _has_live_leader(self) -> bool:
+        if self.role == Role.LEADER:
+            return True
+        elapsed = asyncio.get_running_loop().time() - self._leader_contact
+        return elapsed < self._election_timeout_min
+
+    async def _take_snapshot(self):
+        """Snapshot the canvas at the last applied entry and compact the log up to it once
+        followers allow. The canvas is compressed on a worker thread while entries keep
+        being applied"""
+        index = self.last_applied
+        term = self.log.term_at(index)
+        config = self.log.config_at(index)
+        data = await encode_canvas_in_thread(self.canvas, CanvasEncoding.ZLIB)
+        if index <= self.log.snapshot_index:
+            # A snapshot installed by the leader meanwhile already covers it
+            return
+        snapshot = Snapshot(
+            last_included_index=index,
+            last_included_term=term,
+            data=data,
+            encoding=SnapshotEncoding.ZLIB,
+            config=config,
+        )
+        self._pending_snapshot = snapshot
+        self._compact_log()
+
+    def _compact_log(self):
+        snapshot = self._pending_snapshot
+        if snapshot is None:
+            return
+        index = snapshot.last_included_index
+        if index > self.log.snapshot_index:
             if (
-                self.role == Role.LEADER
-                and self._pending_commits is not None
-                and entry.index in self._pending_commits
+                self.match_index is not None
+                and self.last_applied - index < self.SNAPSHOT_THRESHOLD
+                and any(self.match_index.get(p.node_id, 0) < index for p in self.peers)
             ):
-                self._pending_commits.pop(entry.index).set_result(True)
+                # A follower still needs entries the snapshot would discard
+                return
+            self.log.compact(snapshot)
+            logger.debug(f"Node {self.node_id}: compacted log up to index {index}")
+        self._pending_snapshot = None
+
+    def _restore_snapshot(self, snapshot: Snapshot):
+        data = snapshot.data
+        if snapshot.encoding == SnapshotEncoding.ZLIB:
+            data = zlib.decompress(data)
+        self.canvas.restore(data, snapshot.last_included_index)
+        self.commit_index = max(self.commit_index, snapshot.last_included_index)
+        self.last_applied = snapshot.last_included_index
+        self._wake_apply_waiters()
 
     # handlers
-    def on_append_entries(
+    async def on_append_entries(
         self,
         term: int,
         leader_id: str,
@@ -237,120 +655,457 @@ class RaftNode:
         prev_log_term: int,
         entries: list[LogEntry],
         leader_commit: int,
-    ) -> tuple[int, bool]:
+        heartbeat_interval_ms: int = 0,
+    ) -> AppendEntriesResponse:
         logger.debug(
             f"Node {self.node_id}: called on_append_entries(term={term}, leader_id={leader_id})"
         )
         self._last_heartbeat = asyncio.get_event_loop().time()
 
         if term < self.current_term:
-            return self.current_term, False
+            return AppendEntriesResponse(term=self.current_term, success=False)
 
         if term > self.current_term or self.role == Role.CANDIDATE:
             self._become_follower(term)
 
         self.leader_id = leader_id
+        self._leader_contact = self._last_heartbeat
+        self._leader_contact_event.set()
+        match_index = prev_log_index + len(entries)
+
+        if heartbeat_interval_ms:
+            timeout_min = self._election_timeout_for(heartbeat_interval_ms / 1000)
+            if timeout_min != self._election_timeout_min:
+                self._election_timeout_min = timeout_min
+                self._election_timeout = self._random_election_timeout()
+
+        if prev_log_index < self.log.snapshot_index:
+            # Everything up to the snapshot is committed and so already matches the leader
+            entries = [e for e in entries if e.index > self.log.snapshot_index]
+            prev_log_index = self.log.snapshot_index
+            prev_log_term = self.log.snapshot_term
 
         if prev_log_index > 0:
-            if prev_log_index > len(self.log):
-                return self.current_term, False
-            if self.log[prev_log_index].term != prev_log_term:
-                return self.current_term, False
+            if prev_log_index > self.log.last_index:
+                return AppendEntriesResponse(
+                    term=self.current_term,
+                    success=False,
+                    conflict_index=self.log.last_index + 1,
+                    last_log_index=self.log.last_index,
+                )
+            if self.log.term_at(prev_log_index) != prev_log_term:
+                conflict_term = self.log.term_at(prev_log_index)
+                return AppendEntriesResponse(
+                    term=self.current_term,
+                    success=False,
+                    conflict_term=conflict_term,
+                    conflict_index=self.log.first_index_of_term(conflict_term),
+                    last_log_index=self.log.last_index,
+                )
 
+        config_changed = False
         for entry in entries:
-            if entry.index <= len(self.log):
-                if self.log[entry.index].term != entry.term:
+            if entry.index <= self.log.last_index:
+                if self.log.term_at(entry.index) != entry.term:
+                    config_changed |= self.log.config_index >= entry.index
                     self.log.truncate_from(entry.index)
                     self.log.append(entry)
+                    config_changed |= entry.type == EntryType.CONFIG
             else:
                 self.log.append(entry)
+                config_changed |= entry.type == EntryType.CONFIG
+        if config_changed:
+            self._reload_config()
+        await self.log.sync()
+        if self.current_term != term:
+            # A newer leader took over while the entries were flushed
+            return AppendEntriesResponse(term=self.current_term, success=False)
 
-        if leader_commit > self.commit_index:
-            self.commit_index = min(leader_commit, self.log.last_index)
+        # Entries past the ones this request matched may still be a deposed leader's
+        commit_index = min(leader_commit, match_index)
+        if commit_index > self.commit_index:
+            self.commit_index = commit_index
             self._apply_committed()
 
-        return self.current_term, True
+        return AppendEntriesResponse(
+            term=self.current_term,
+            success=True,
+            match_index=match_index,
+            last_log_index=self.log.last_index,
+        )
+
+    def on_install_snapshot(self, term: int, leader_id: str, snapshot: Snapshot) -> int:
+        logger.debug(
+            f"Node {self.node_id}: called on_install_snapshot(term={term}, leader_id={leader_id}, index={snapshot.last_included_index})"
+        )
+        self._last_heartbeat = asyncio.get_event_loop().time()
+
+        if term < self.current_term:
+            return self.current_term
+
+        if term > self.current_term or self.role == Role.CANDIDATE:
+            self._become_follower(term)
+
+        self.leader_id = leader_id
+        self._leader_contact = self._last_heartbeat
+        self._leader_contact_event.set()
+
+        if snapshot.last_included_index <= self.commit_index:
+            return self.current_term
+
+        self.log.compact(snapshot)
+        self._restore_snapshot(snapshot)
+        self._reload_config()
+        return self.current_term
 
     def on_request_vote(
-        self, term: int, candidate_id: str, last_log_index: int, last_log_term: int
+        self,
+        term: int,
+        candidate_id: str,
+        last_log_index: int,
+        last_log_term: int,
+        pre_vote: bool = False,
+        leadership_transfer: bool = False,
     ) -> tuple[int, bool]:
         logger.debug(
-            f"Node {self.node_id}: called on_request_vote(term={term}, candidate_id={candidate_id})"
+            f"Node {self.node_id}: called on_request_vote(term={term}, candidate_id={candidate_id}, pre_vote={pre_vote})"
         )
+        if self.learner:
+            return self.current_term, False
+
+        if pre_vote:
+            # Nothing changes on a pre-vote, not even the term
+            granted = (
+                term > self.current_term
+                and not self._has_live_leader()
+                and self._log_up_to_date(last_log_index, last_log_term)
+            )
+            return self.current_term, granted
+
         if term < self.current_term:
             return self.current_term, False
 
+        if term > self.current_term and self._has_live_leader() and not leadership_transfer:
+            # Leases rely on nobody else being elected while the leader is still heard
+            # from, so the candidate is ignored and its term not adopted
+            logger.debug(f"Node {self.node_id}: ignoring vote request, leader is alive")
+            return self.current_term, False
+
         if term > self.current_term:
             self._become_follower(term)
 
         vote_granted = False
         if self.voted_for in (None, candidate_id):
-            my_last_index = self.log.last_index
-            my_last_term = self.log.last_term
-
-            log_ok = last_log_term > my_last_term or (
-                last_log_term == my_last_term and last_log_index >= my_last_index
-            )
-
-            if log_ok:
+            if self._log_up_to_date(last_log_index, last_log_term):
                 logger.debug(
                     f"Node {self.node_id}: granting vote to {candidate_id} for term {term}"
                 )
                 self.voted_for = candidate_id
+                self._persist_hard_state()
                 self._last_heartbeat = asyncio.get_event_loop().time()
                 vote_granted = True
 
         return self.current_term, vote_granted
 
+    async def on_timeout_now(self, term: int, leader_id: str) -> tuple[int, bool]:
+        logger.debug(
+            f"Node {self.node_id}: called on_timeout_now(term={term}, leader_id={leader_id})"
+        )
+        if term != self.current_term or self.role != Role.FOLLOWER or self.learner:
+            return self.current_term, False
+        await self._start_election(transfer=True)
+        return self.current_term, self.leader_id == self.node_id
+
+    def _log_up_to_date(self, last_log_index: int, last_log_term: int) -> bool:
+        """Whether a candidate's log is at least as up to date as ours"""
+        my_last_term = self.log.last_term
+        return last_log_term > my_last_term or (
+            last_log_term == my_last_term and last_log_index >= self.log.last_index
+        )
+
     # API
-    async def submit_pixel(self, x: int, y: int, color: int) -> bool:
+    async def transfer_leadership(self, target_id: str | None = None) -> str | None:
+        """Hand leadership over to `target_id`, by default the follower with the highest
+        match index, for instance before restarting this node.
+
+        Submissions are held while the target is brought up to date and told to start an
+        election. Returns the new leader's id, or None if this node is still leading or
+        no leader has been heard from within TRANSFER_TIMEOUT.
+        """
+        if self.role != Role.LEADER or self.match_index is None:
+            return None
+        if not self._transfer_done.is_set():
+            return None
+        match_index = self.match_index
+        if target_id is None:
+            voter_ids = [peer.node_id for peer in self.voters]
+            target_id = max(voter_ids, key=match_index.__getitem__, default=None)
+        target = self._get_peer(target_id) if target_id is not None else None
+        if target is None or target.learner:
+            return None
+
+        logger.info(f"Node {self.node_id}: transferring leadership to {target.node_id}")
+        term = self.current_term
+        self._transfer_done.clear()
+        try:
+            async with asyncio.timeout(self.TRANSFER_TIMEOUT):
+                # With submissions held the log stops growing, so the target catches up
+                while (
+                    self.role == Role.LEADER and match_index[target.node_id] < self.log.last_index
+                ):
+                    self._ack_event.clear()
+                    await self._ack_event.wait()
+                if self.role != Role.LEADER or self.current_term != term:
+                    return None
+
+                self._lease_revoked_term = term
+                response = await self.grpc_client.timeout_now(target, term)
+                if not response.success:
+                    return None
+                # Held submissions are forwarded once the new leader is known
+                while self.leader_id is None or self.leader_id == self.node_id:
+                    self._leader_contact_event.clear()
+                    await self._leader_contact_event.wait()
+                return self.leader_id
+        except TimeoutError:
+            logger.warning(f"Node {self.node_id}: leadership transfer timed out")
+            return None
+        except Exception as e:
+            logger.warning(f"Node {self.node_id}: leadership transfer failed: {e}")
+            return None
+        finally:
+            self._transfer_done.set()
+
+    async def submit_pixel(self, x: int, y: int, color: int) -> int | None:
+        """Replicate a pixel update, returning the log index it committed at, or None
+        if it could not be committed"""
+        if not self._transfer_done.is_set():
+            await self._transfer_done.wait()
         logger.debug(f"Node {self.node_id}: called submit_pixel(x={x}, y={y}, color={color})")
         logger.debug(f"Node {self.node_id}: role={self.role.name}, leader_id={self.leader_id}")
         if self.role == Role.LEADER:
             if self._pending_commits is None or self.next_index is None:
-                logger.debug(f"Node {self.node_id}: leader missing required state, returning False")
-                return False
+                logger.debug(f"Node {self.node_id}: leader missing required state, returning None")
+                return None
+            if not self._valid_pixels([x], [y], [color]):
+                return None
 
             logger.debug(f"Node {self.node_id}: leader processing pixel submission")
-            entry = LogEntry(
-                term=self.current_term,
-                index=self.log.last_index + 1,
-                x=x,
-                y=y,
-                color=color,
+            return await self._replicate(
+                LogEntry(
+                    term=self.current_term,
+                    index=self.log.last_index + 1,
+                    x=x,
+                    y=y,
+                    color=color,
+                )
             )
-            self.log.append(entry)
-            logger.debug(f"Node {self.node_id}: added entry to log at index {entry.index}")
-
-            future = asyncio.get_event_loop().create_future()
-            self._pending_commits[entry.index] = future
-
-            try:
-                logger.debug(f"Node {self.node_id}: waiting for commit with 30s timeout")
-                result = await asyncio.wait_for(future, timeout=self.COMMIT_TIMEOUT)
-                logger.debug(f"Node {self.node_id}: commit completed with result={result}")
-                return result
-            except TimeoutError:
-                logger.debug(f"Node {self.node_id}: commit timed out after {self.COMMIT_TIMEOUT}s")
-                if self._pending_commits is not None and entry.index in self._pending_commits:
-                    del self._pending_commits[entry.index]
-                return False
         else:
             if not self.leader_id:
-                logger.debug(f"Node {self.node_id}: no leader_id, returning False")
-                return False
+                logger.debug(f"Node {self.node_id}: no leader_id, returning None")
+                return None
 
-            leader_peer = self._get_peer(self.leader_id)
-            if leader_peer:
-                try:
-                    logger.debug(f"Node {self.node_id}: forwarding to leader {self.leader_id}")
-                    response = await self.grpc_client.submit_pixel(leader_peer, x, y, color)
-                    logger.debug(f"Node {self.node_id}: leader response success={response.success}")
-                    return response.success
-                except Exception as e:
-                    logger.debug(f"Node {self.node_id}: exception forwarding to leader: {e}")
-                    return False
-            logger.debug(
-                f"Node {self.node_id}: leader_peer not found for leader_id={self.leader_id}"
+            logger.debug(f"Node {self.node_id}: forwarding to leader {self.leader_id}")
+            return await self.forwarder.submit([x], [y], [color])
+
+    async def submit_pixels(self, xs: list[int], ys: list[int], colors: list[int]) -> int | None:
+        """Replicate many pixel updates as a single log entry, so they commit and are
+        applied together. Returns the log index of the batch, or None if it could not
+        be committed"""
+        if not self._transfer_done.is_set():
+            await self._transfer_done.wait()
+        logger.debug(f"Node {self.node_id}: called submit_pixels(count={len(xs)})")
+        if self.role == Role.LEADER:
+            if self._pending_commits is None or not self._valid_pixels(xs, ys, colors):
+                return None
+            return await self._replicate(
+                LogEntry(
+                    term=self.current_term,
+                    index=self.log.last_index + 1,
+                    type=EntryType.PIXELS,
+                    xs=xs,
+                    ys=ys,
+                    colors=colors,
+                )
+            )
+        return await self.forwarder.submit(xs, ys, colors)
+
+    def _valid_pixels(self, xs: list[int], ys: list[int], colors: list[int]) -> bool:
+        """Whether a write may enter the log. Writes reach the leader from peers as well as
+        from clients, and one that cannot be applied would stall every node applying it"""
+        if not 0 < len(xs) == len(ys) == len(colors) <= MAX_PIXELS_PER_BATCH:
+            logger.warning(
+                f"Node {self.node_id}: rejected a write of {len(xs)}, {len(ys)} and {len(colors)} coordinates and colors"
             )
             return False
+        contains = self.canvas.contains
+        if not all(contains(x, y) for x, y in zip(xs, ys, strict=True)):
+            logger.warning(f"Node {self.node_id}: rejected a write outside of the canvas")
+            return False
+        if not all(0 <= color <= MAX_COLOR for color in colors):
+            logger.warning(f"Node {self.node_id}: rejected a write with an invalid color")
+            return False
+        return True
+
+    async def _replicate(self, entry: LogEntry) -> int | None:
+        """Append `entry` to the leader's log and wait for it to commit, returning its
+        index, or None if it did not commit within COMMIT_TIMEOUT"""
+        assert self._pending_commits is not None
+        self.log.append(entry)
+        logger.debug(f"Node {self.node_id}: added entry to log at index {entry.index}")
+        if entry.type == EntryType.CONFIG:
+            self._reload_config()
+
+        future = asyncio.get_event_loop().create_future()
+        self._pending_commits[entry.index] = future
+        self._notify_new_entries()
+
+        try:
+            logger.debug(f"Node {self.node_id}: waiting for commit with 30s timeout")
+            result = await asyncio.wait_for(future, timeout=self.COMMIT_TIMEOUT)
+            logger.debug(f"Node {self.node_id}: commit completed with result={result}")
+            return entry.index if result else None
+        except TimeoutError:
+            logger.debug(f"Node {self.node_id}: commit timed out after {self.COMMIT_TIMEOUT}s")
+            if self._pending_commits is not None and entry.index in self._pending_commits:
+                del self._pending_commits[entry.index]
+            return None
+
+    async def add_member(self, peer: PeerNode) -> int | None:
+        """Add `peer` to the cluster. It joins as a learner and, unless `peer.learner` is
+        set, is promoted to voter once it has caught up with the commit index, so a new
+        node never holds up commits while it receives the log. Passing a learner already
+        listed with `peer.learner` unset promotes it the same way.
+
+        Returns the index of the last membership change, or None if this node does not
+        lead or the change did not go through.
+        """
+        current = next((m for m in self._members if m.node_id == peer.node_id), None)
+        if current == peer:
+            return self.log.config_index
+        if current is None:
+            index = await self._change_membership(
+                [*self._members, peer.model_copy(update={"learner": True})]
+            )
+            if index is None or peer.learner:
+                return index
+        if (current is None or current.learner) and not peer.learner:
+            if not await self._wait_caught_up(peer.node_id):
+                logger.warning(f"Node {self.node_id}: {peer.node_id} did not catch up in time")
+                return None
+        return await self._change_membership(
+            [peer if m.node_id == peer.node_id else m for m in self._members]
+        )
+
+    async def remove_member(self, node_id: str) -> int | None:
+        """Remove `node_id` from the cluster. A leader removing itself keeps leading
+        until the change commits, then steps down. Returns the index of the change"""
+        members = [m for m in self._members if m.node_id != node_id]
+        if len(members) == len(self._members) or all(m.learner for m in members):
+            return None
+        return await self._change_membership(members)
+
+    async def _change_membership(self, members: list[PeerNode]) -> int | None:
+        """Replace the membership through the log, one change at a time. Adding or
+        removing a single node per change keeps every old and new majority overlapping.
+        None if this node does not lead or cannot commit in its term within
+        COMMIT_TIMEOUT"""
+        if self.role != Role.LEADER:
+            return None
+        term = self.current_term
+        try:
+            async with asyncio.timeout(self.COMMIT_TIMEOUT):
+                await self._transfer_done.wait()
+                # Changes made by an earlier leader only count once committed in this term
+                await self.wait_applied(self._term_start_index)
+        except TimeoutError:
+            logger.warning(f"Node {self.node_id}: timed out waiting to change membership")
+            return None
+        if self.role != Role.LEADER or self.current_term != term:
+            return None
+        if self.log.config_index > self.commit_index:
+            logger.debug(f"Node {self.node_id}: membership change already in progress")
+            return None
+
+        logger.info(f"Node {self.node_id}: changing membership to {[m.node_id for m in members]}")
+        config = ClusterConfig(members=[peer_to_member(m) for m in members])
+        return await self._replicate(
+            LogEntry(term=term, index=self.log.last_index + 1, type=EntryType.CONFIG, config=config)
+        )
+
+    async def _wait_caught_up(self, node_id: str) -> bool:
+        try:
+            async with asyncio.timeout(self.MEMBER_CATCH_UP_TIMEOUT):
+                while self.role == Role.LEADER and self.match_index is not None:
+                    if self.match_index.get(node_id, 0) >= self.commit_index:
+                        return True
+                    self._ack_event.clear()
+                    await self._ack_event.wait()
+        except TimeoutError:
+            pass
+        return False
+
+    async def read_index(self, lease: bool = False) -> int | None:
+        """Wait until this node has applied every entry committed before the call, so a
+        read of the canvas that follows is linearizable.
+
+        Leadership is confirmed with a heartbeat round, or with `lease` from the leader's
+        read lease when it holds one. Returns the read index, or None if no leader
+        confirmed it within READ_TIMEOUT.
+        """
+        try:
+            async with asyncio.timeout(self.READ_TIMEOUT):
+                if self.role == Role.LEADER:
+                    index = await self.confirm_read_index(lease)
+                else:
+                    index = await self._forward_read_index(lease)
+                if index is None:
+                    return None
+                await self.wait_applied(index)
+                return index
+        except TimeoutError:
+            logger.debug(f"Node {self.node_id}: read index timed out")
+            return None
+
+    async def confirm_read_index(self, lease: bool = False) -> int | None:
+        """Leader side of read_index(): the commit index once it is known to be current
+        and this node is confirmed to still lead, None if it does not"""
+        if self.role != Role.LEADER:
+            return None
+        term = self.current_term
+
+        await self.wait_applied(self._term_start_index)
+        if self.role != Role.LEADER or self.current_term != term:
+            return None
+        read_index = self.commit_index
+
+        # No lease while a transfer is under way, the target may be elected at any time
+        loop = asyncio.get_running_loop()
+        if (
+            lease
+            and self._transfer_done.is_set()
+            and self._lease_revoked_term != term
+            and loop.time() < self._quorum_ack_time() + self._lease_duration()
+        ):
+            return read_index
+
+        started = loop.time()
+        for replicator in self._replicators.values():
+            replicator.request_heartbeat()
+        while self._quorum_ack_time() < started:
+            self._ack_event.clear()
+            await self._ack_event.wait()
+            if self.role != Role.LEADER or self.current_term != term:
+                return None
+        return read_index
+
+    async def _forward_read_index(self, lease: bool) -> int | None:
+        leader_peer = self._get_peer(self.leader_id) if self.leader_id else None
+        if leader_peer is None:
+            return None
+        try:
+            response = await self.grpc_client.read_index(leader_peer, lease)
+        except Exception as e:
+            logger.debug(f"Node {self.node_id}: exception asking leader for read index: {e}")
+            return None
+        return response.read_index if response.success else None
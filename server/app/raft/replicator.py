@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import logging
+from typing import TYPE_CHECKING
+
+from app.generated.grpc.messages_pb2 import (
+    AppendEntriesRequest,
+    AppendEntriesResponse,
+    Snapshot,
+)
+from app.schemas import PeerNode
+
+if TYPE_CHECKING:
+    from app.raft.node import RaftNode
+
+logger = logging.getLogger(__name__)
+
+
+class PeerReplicator:
+    """Long-lived replication loop from the leader to a single follower.
+
+    Every peer gets its own replicator for the duration of a leadership term, so a slow
+    or dead follower only ever delays itself. Once the follower's position is known the
+    replicator pipelines up to MAX_INFLIGHT AppendEntries, optimistically advancing
+    `next_index` as each one is sent.
+
+    Each AppendEntries carries at most MAX_ENTRIES_PER_APPEND entries and roughly
+    MAX_BYTES_PER_APPEND bytes. A follower lagging by more than CATCH_UP_THRESHOLD
+    entries is instead fed through a single compressed CatchUp stream of such chunks.
+
+    `last_ack` is the send time of the latest request the follower answered within the
+    term, which the leader uses to confirm reads and to hold its read lease. `rtt` is a
+    moving average of AppendEntries round trips, from which the heartbeat interval is
+    derived.
+    """
+
+    RTT_SMOOTHING = 0.2
+
+    MAX_INFLIGHT = 4
+    MAX_ENTRIES_PER_APPEND = 512
+    MAX_BYTES_PER_APPEND = 1 << 20
+    CATCH_UP_THRESHOLD = 4 * MAX_ENTRIES_PER_APPEND
+    CATCH_UP_MAX_ENTRIES = 64 * MAX_ENTRIES_PER_APPEND
+
+    def __init__(self, node: RaftNode, peer: PeerNode):
+        self.node = node
+        self.peer = peer
+        self.term = node.current_term
+
+        self._wake_event = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._last_sent = 0.0
+        self._retry_at = 0.0
+        self._heartbeat_requested = False
+        self.last_ack = 0.0
+        self.rtt: float | None = None
+
+        # Bumped whenever next_index is rewound, so that failures of requests sent before
+        # the rewind are not acted upon twice
+        self._generation = 0
+        # While probing for the follower's position only one request is kept in flight
+        self._probing = True
+        self._catching_up = False
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._inflight:
+            task.cancel()
+        self._inflight.clear()
+
+    def wake(self):
+        self._wake_event.set()
+
+    def request_heartbeat(self):
+        """Send a request right away, even if nothing is due, to refresh `last_ack`"""
+        self._heartbeat_requested = True
+        self.wake()
+
+    @property
+    def _next_index(self) -> int:
+        assert self.node.next_index is not None
+        return self.node.next_index[self.peer.node_id]
+
+    @_next_index.setter
+    def _next_index(self, value: int):
+        assert self.node.next_index is not None
+        self.node.next_index[self.peer.node_id] = value
+
+    @property
+    def _match_index(self) -> int:
+        assert self.node.match_index is not None
+        return self.node.match_index[self.peer.node_id]
+
+    @_match_index.setter
+    def _match_index(self, value: int):
+        assert self.node.match_index is not None
+        self.node.match_index[self.peer.node_id] = value
+
+    def _has_unsent(self) -> bool:
+        return self._next_index <= self.node.log.last_index
+
+    def _ready(self, now: float) -> bool:
+        if now < self._retry_at:
+            return False
+        if len(self._inflight) >= self.MAX_INFLIGHT or self._catching_up:
+            return False
+        if self._heartbeat_requested:
+            return True
+        if self._probing and self._inflight:
+            return False
+        if self._has_unsent():
+            return True
+        return now - self._last_sent >= self.node.heartbeat_interval
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake_event.clear()
+            now = loop.time()
+            if self._ready(now):
+                self._dispatch()
+                continue
+
+            # Only idle replicators need the heartbeat timer, busy ones get woken by
+            # their in-flight requests completing
+            timeout = None
+            if not self._inflight:
+                timeout = max(self._retry_at, self._last_sent + self.node.heartbeat_interval) - now
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+            except TimeoutError:
+                pass
+
+    def _dispatch(self):
+        next_idx = self._next_index
+        sent_at = self._last_sent = asyncio.get_running_loop().time()
+        self._heartbeat_requested = False
+
+        snapshot = self.node.log.snapshot
+        if snapshot is not None and next_idx <= snapshot.last_included_index:
+            # The entries this follower needs have been compacted away
+            self._next_index = snapshot.last_included_index + 1
+            self._catching_up = True
+            self._track(self._install_snapshot(snapshot, self._generation, sent_at))
+            return
+
+        if not self._probing and not self._inflight and self._lag() > self.CATCH_UP_THRESHOLD:
+            stop_idx = min(self.node.log.last_index, next_idx + self.CATCH_UP_MAX_ENTRIES - 1)
+            self._next_index = stop_idx + 1
+            self._catching_up = True
+            self._track(self._catch_up(next_idx, stop_idx, self._generation, sent_at))
+            return
+
+        count, entries = 0, b""
+        if not (self._probing and self._inflight) and self.node.entry_encoder is not None:
+            # A heartbeat requested while probing must not move the probe
+            count, entries = self.node.entry_encoder.encode_from(
+                next_idx, self.MAX_ENTRIES_PER_APPEND, self.MAX_BYTES_PER_APPEND
+            )
+        self._next_index = next_idx + count
+        self._track(self._send(next_idx, entries, self._generation, sent_at))
+
+    def _lag(self) -> int:
+        return self.node.log.last_index - self._next_index + 1
+
+    def _track(self, coro):
+        task = asyncio.create_task(coro)
+        self._inflight.add(task)
+        task.add_done_callback(self._on_send_done)
+
+    def _on_send_done(self, task: asyncio.Task[None]):
+        self._inflight.discard(task)
+        self.wake()
+
+    async def _send(self, next_idx: int, entries: bytes, generation: int, sent_at: float):
+        node = self.node
+        prev_log_index = next_idx - 1
+        try:
+            resp = await node.grpc_client.append_entries(
+                self.peer,
+                term=self.term,
+                leader_id=node.node_id,
+                prev_log_index=prev_log_index,
+                prev_log_term=node.log.term_at(prev_log_index),
+                entries=entries,
+                leader_commit=node.commit_index,
+                heartbeat_interval_ms=node._advertise_heartbeat_interval(),
+            )
+            logger.debug(
+                f"Node {node.node_id}: append_entries to {self.peer.node_id} succeeded: term={resp.term}, success={resp.success}"
+            )
+        except Exception as e:
+            logger.debug(f"Node {node.node_id}: append_entries to {self.peer.node_id} failed: {e}")
+            self._on_failure(generation)
+            return
+
+        self._sample_rtt(asyncio.get_running_loop().time() - sent_at)
+        self._on_response(resp, next_idx, generation, sent_at)
+
+    def _sample_rtt(self, rtt: float):
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += self.RTT_SMOOTHING * (rtt - self.rtt)
+
+    async def _catch_up(self, next_idx: int, stop_idx: int, generation: int, sent_at: float):
+        node = self.node
+        logger.debug(
+            f"Node {node.node_id}: streaming entries {next_idx}..{stop_idx} to {self.peer.node_id}"
+        )
+        try:
+            resp = await node.grpc_client.catch_up(
+                self.peer, self._catch_up_requests(next_idx, stop_idx)
+            )
+        except Exception as e:
+            logger.debug(f"Node {node.node_id}: catch_up to {self.peer.node_id} failed: {e}")
+            self._on_failure(generation)
+            return
+        finally:
+            self._catching_up = False
+
+        self._on_response(resp, next_idx, generation, sent_at)
+
+    async def _catch_up_requests(
+        self, next_idx: int, stop_idx: int
+    ) -> AsyncIterator[AppendEntriesRequest]:
+        node = self.node
+        while next_idx <= stop_idx:
+            entries = node.log.entries_from(
+                next_idx,
+                min(self.MAX_ENTRIES_PER_APPEND, stop_idx - next_idx + 1),
+                self.MAX_BYTES_PER_APPEND,
+            )
+            yield AppendEntriesRequest(
+                term=self.term,
+                leader_id=node.node_id,
+                prev_log_index=next_idx - 1,
+                prev_log_term=node.log.term_at(next_idx - 1),
+                entries=entries,
+                leader_commit=node.commit_index,
+            )
+            next_idx += len(entries)
+
+    async def _install_snapshot(self, snapshot: Snapshot, generation: int, sent_at: float):
+        node = self.node
+        logger.debug(
+            f"Node {node.node_id}: sending snapshot at {snapshot.last_included_index} to {self.peer.node_id}"
+        )
+        try:
+            resp = await node.grpc_client.install_snapshot(
+                self.peer, term=self.term, leader_id=node.node_id, snapshot=snapshot
+            )
+        except Exception as e:
+            logger.debug(
+                f"Node {node.node_id}: install_snapshot to {self.peer.node_id} failed: {e}"
+            )
+            self._on_failure(generation)
+            return
+        finally:
+            self._catching_up = False
+
+        if resp.term > node.current_term:
+            node._become_follower(resp.term)
+            return
+        if node.current_term != self.term or node.match_index is None:
+            return
+
+        self._on_ack(sent_at)
+        self._on_match(snapshot.last_included_index)
+
+    def _on_failure(self, generation: int):
+        if generation == self._generation:
+            self._rewind(self._match_index + 1)
+            # Unreachable peers are retried at heartbeat pace rather than in a tight loop
+            self._retry_at = asyncio.get_running_loop().time() + self.node.HEARTBEAT_INTERVAL
+
+    def _on_response(
+        self, resp: AppendEntriesResponse, next_idx: int, generation: int, sent_at: float
+    ):
+        node = self.node
+        if resp.term > node.current_term:
+            node._become_follower(resp.term)
+            return
+        if node.current_term != self.term or node.match_index is None:
+            return
+
+        # Even a rejection shows the follower still accepts this leader for the term
+        self._on_ack(sent_at)
+
+        if resp.success:
+            self._on_match(resp.match_index)
+        elif resp.last_log_index < self._match_index:
+            # The follower lost entries it had acknowledged, restarted with its log in
+            # memory only, so probe from where its log now ends
+            logger.info(
+                f"Node {node.node_id}: {self.peer.node_id} has lost its log after index {resp.last_log_index}"
+            )
+            self._match_index = resp.last_log_index
+            self._rewind(resp.last_log_index + 1)
+        elif generation == self._generation:
+            self._rewind(self._backtrack(resp, next_idx))
+
+    def _on_ack(self, sent_at: float):
+        if sent_at > self.last_ack:
+            self.last_ack = sent_at
+            self.node._on_peer_ack()
+
+    def _on_match(self, match: int):
+        if match > self._match_index:
+            self._match_index = match
+        if self._next_index <= match:
+            self._next_index = match + 1
+        self._probing = False
+        self.node._try_advance_commit_index()
+
+    def _backtrack(self, resp: AppendEntriesResponse, next_idx: int) -> int:
+        """Pick the next index to probe from the follower's conflict hints, skipping a
+        whole term per round trip instead of a single entry"""
+        if not resp.conflict_index:
+            return next_idx - 1
+        if resp.conflict_term:
+            last = self.node.log.last_index_of_term(resp.conflict_term)
+            if last:
+                return last + 1
+        return resp.conflict_index
+
+    def _rewind(self, next_idx: int):
+        self._next_index = max(next_idx, 1)
+        self._generation += 1
+        self._probing = True
@@ -0,0 +1,293 @@
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+import logging
+import os
+from pathlib import Path
+import struct
+import threading
+from typing import BinaryIO
+import zlib
+
+from app.generated.grpc.messages_pb2 import LogEntry, Snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class LogStorage(ABC):
+    """Persistence backend behind a RaftLog"""
+
+    @abstractmethod
+    def load(self) -> tuple[Snapshot | None, list[LogEntry]]:
+        """The latest snapshot and every entry after it"""
+
+    @abstractmethod
+    def append(self, entries: list[LogEntry]) -> None:
+        """Write entries after the current tail. They are not durable until sync()"""
+
+    @abstractmethod
+    def truncate_from(self, index: int) -> None:
+        """Durably drop the entry at `index` and everything after it"""
+
+    @abstractmethod
+    def sync(self) -> None:
+        """Make every appended entry durable. Called from a worker thread while the event
+        loop may keep appending"""
+
+    @abstractmethod
+    def save_snapshot(self, snapshot: Snapshot) -> None:
+        """Durably store the snapshot, then drop the entries it covers"""
+
+    @abstractmethod
+    def load_hard_state(self) -> tuple[int, str | None]: ...
+
+    @abstractmethod
+    def save_hard_state(self, term: int, voted_for: str | None) -> None: ...
+
+
+class SegmentedLogStorage(LogStorage):
+    """Append-only write-ahead log split over segment files in `data_dir`.
+
+    Each segment is named after the index of its first entry and holds records of
+    `<u32 length><u32 crc32><LogEntry protobuf>`. Appends are buffered and made durable
+    by a single fsync in sync(), so a whole batch of entries costs one disk flush. A torn
+    or corrupt record at the tail, left behind by a crash mid-write, is cut off on load.
+    Term and vote, and the latest snapshot, live in separate files that are replaced
+    atomically. Segments wholly covered by the snapshot are deleted.
+    """
+
+    SEGMENT_SIZE = 64 * 1024 * 1024
+    SEGMENT_SUFFIX = ".wal"
+    HARD_STATE_FILE = "hard_state"
+    SNAPSHOT_FILE = "snapshot"
+
+    _RECORD_HEADER = struct.Struct("<II")
+    _HARD_STATE_HEADER = struct.Struct("<qI")
+
+    def __init__(self, data_dir: str | Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # First index of every segment, oldest first, and the file offset of every record
+        # after the snapshot so truncation can seek straight to it
+        self._segments: list[int] = []
+        self._offsets = array("q")
+        self._snapshot_index = 0
+        self._last_index = 0
+
+        self._active: BinaryIO | None = None
+        self._active_size = 0
+        self._dirty = False
+        # Held while syncing, which runs on a worker thread, and closing the active segment
+        self._sync_lock = threading.Lock()
+
+    def _segment_path(self, first_index: int) -> Path:
+        return self.data_dir / f"{first_index:020d}{self.SEGMENT_SUFFIX}"
+
+    def _segment_of(self, index: int) -> int:
+        """Position in self._segments of the segment holding `index`"""
+        return bisect_right(self._segments, index) - 1
+
+    def load(self) -> tuple[Snapshot | None, list[LogEntry]]:
+        self._close_active()
+        snapshot = self._load_snapshot()
+        self._snapshot_index = snapshot.last_included_index if snapshot is not None else 0
+        self._segments = sorted(
+            int(path.name.removesuffix(self.SEGMENT_SUFFIX))
+            for path in self.data_dir.glob(f"*{self.SEGMENT_SUFFIX}")
+        )
+        self._offsets = array("q")
+
+        entries: list[LogEntry] = []
+        next_index = self._segments[0] if self._segments else 1
+        for pos, first_index in enumerate(self._segments):
+            if first_index != next_index or first_index > self._snapshot_index + len(entries) + 1:
+                # A gap means later segments cannot be trusted, drop them
+                logger.warning(f"WAL segment {first_index} does not follow index {next_index - 1}")
+                self._drop_segments(pos)
+                break
+            path = self._segment_path(first_index)
+            valid_size, next_index = self._read_segment(path, next_index, entries)
+            if valid_size < path.stat().st_size:
+                logger.warning(f"WAL segment {path.name} has a torn tail, truncating")
+                self._truncate_file(path, valid_size)
+                self._drop_segments(pos + 1)
+                break
+
+        self._last_index = self._snapshot_index + len(entries)
+        return snapshot, entries
+
+    def _read_segment(
+        self, path: Path, next_index: int, entries: list[LogEntry]
+    ) -> tuple[int, int]:
+        data = path.read_bytes()
+        offset = 0
+        header_size = self._RECORD_HEADER.size
+        while offset + header_size <= len(data):
+            length, crc = self._RECORD_HEADER.unpack_from(data, offset)
+            payload = data[offset + header_size : offset + header_size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            entry = LogEntry.FromString(payload)
+            if entry.index != next_index:
+                break
+            # Records already covered by the snapshot are skipped, not loaded
+            if entry.index > self._snapshot_index:
+                entries.append(entry)
+                self._offsets.append(offset)
+            offset += header_size + length
+            next_index += 1
+        return offset, next_index
+
+    def append(self, entries: list[LogEntry]) -> None:
+        for entry in entries:
+            if self._active is None or self._active_size >= self.SEGMENT_SIZE:
+                self._roll_segment(entry.index)
+            assert self._active is not None
+
+            payload = entry.SerializeToString()
+            self._offsets.append(self._active_size)
+            self._active.write(self._RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self._active.write(payload)
+            self._active_size += self._RECORD_HEADER.size + len(payload)
+            self._last_index = entry.index
+        self._dirty = True
+
+    def _roll_segment(self, first_index: int):
+        if self._active is None and self._segments:
+            # Reopen the newest segment unless it is already full
+            path = self._segment_path(self._segments[-1])
+            size = path.stat().st_size
+            if size < self.SEGMENT_SIZE:
+                self._active = open(path, "ab")
+                self._active_size = size
+                return
+
+        self.sync()
+        self._close_active()
+        self._segments.append(first_index)
+        self._active = open(self._segment_path(first_index), "ab")
+        self._active_size = 0
+        self._fsync_dir()
+
+    def truncate_from(self, index: int) -> None:
+        if index > self._last_index or not self._segments:
+            return
+
+        self.sync()
+        self._close_active()
+        offset_pos = index - self._snapshot_index - 1
+        pos = self._segment_of(index)
+        if self._segments[pos] == index:
+            self._drop_segments(pos)
+        else:
+            self._drop_segments(pos + 1)
+            self._truncate_file(self._segment_path(self._segments[pos]), self._offsets[offset_pos])
+
+        del self._offsets[offset_pos:]
+        self._last_index = index - 1
+
+    def save_snapshot(self, snapshot: Snapshot) -> None:
+        payload = snapshot.SerializeToString()
+        self._replace_file(
+            self.SNAPSHOT_FILE,
+            self._RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload,
+        )
+
+        index = snapshot.last_included_index
+        if index >= self._last_index:
+            # Nothing in the log outlives the snapshot, start afresh right after it
+            self.sync()
+            self._close_active()
+            self._drop_segments(0)
+            self._offsets = array("q")
+            self._last_index = index
+        else:
+            # Segments are dropped oldest first here, their successors still follow on
+            # from the snapshot if we crash part way
+            covered = self._segment_of(index + 1)
+            for first_index in self._segments[:covered]:
+                self._segment_path(first_index).unlink(missing_ok=True)
+            del self._segments[:covered]
+            del self._offsets[: index - self._snapshot_index]
+            self._fsync_dir()
+        self._snapshot_index = index
+
+    def _load_snapshot(self) -> Snapshot | None:
+        path = self.data_dir / self.SNAPSHOT_FILE
+        if not path.exists():
+            return None
+        data = path.read_bytes()
+        length, crc = self._RECORD_HEADER.unpack_from(data)
+        payload = data[self._RECORD_HEADER.size : self._RECORD_HEADER.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupt raft snapshot in {path}")
+        return Snapshot.FromString(payload)
+
+    def _drop_segments(self, pos: int):
+        # Newest first, so a crash part way leaves a contiguous prefix behind
+        for first_index in reversed(self._segments[pos:]):
+            self._segment_path(first_index).unlink(missing_ok=True)
+        del self._segments[pos:]
+        self._fsync_dir()
+
+    def _truncate_file(self, path: Path, size: int):
+        with open(path, "r+b") as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def sync(self) -> None:
+        with self._sync_lock:
+            if self._active is None or not self._dirty:
+                return
+            # Cleared first, entries appended during the flush mark the segment dirty again
+            self._dirty = False
+            try:
+                self._active.flush()
+                os.fsync(self._active.fileno())
+            except BaseException:
+                self._dirty = True
+                raise
+
+    def _close_active(self):
+        with self._sync_lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+                self._active_size = 0
+
+    def _fsync_dir(self):
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load_hard_state(self) -> tuple[int, str | None]:
+        path = self.data_dir / self.HARD_STATE_FILE
+        if not path.exists():
+            return 0, None
+        data = path.read_bytes()
+        term, crc = self._HARD_STATE_HEADER.unpack_from(data)
+        voted_for = data[self._HARD_STATE_HEADER.size :]
+        if zlib.crc32(voted_for) != crc:
+            raise ValueError(f"Corrupt raft hard state in {path}")
+        return term, voted_for.decode() or None
+
+    def save_hard_state(self, term: int, voted_for: str | None) -> None:
+        voted_for_bytes = (voted_for or "").encode()
+        self._replace_file(
+            self.HARD_STATE_FILE,
+            self._HARD_STATE_HEADER.pack(term, zlib.crc32(voted_for_bytes)) + voted_for_bytes,
+        )
+
+    def _replace_file(self, name: str, data: bytes):
+        path = self.data_dir / name
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._fsync_dir()
@@ -1,11 +1,24 @@
 from pydantic import BaseModel, Field
 
+# Most pixels written in a single batch, which is also a single log entry
+MAX_PIXELS_PER_BATCH = 10_000
+# Colors are stored as uint32
+MAX_COLOR = 0xFFFFFFFF
+
+
+class Pixel(BaseModel):
+    x: int
+    y: int
+    color: int = Field(ge=0, le=MAX_COLOR)
+
 
 class PeerNode(BaseModel):
     node_id: str = Field(...)
     host: str = Field(...)
     http_port: int = Field(...)
     grpc_port: int = Field(...)
+    # Learners receive the log but neither vote nor count towards the commit quorum
+    learner: bool = False
 
     @property
     def http_url(self) -> str:
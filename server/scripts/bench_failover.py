@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Measures leader failure to first commit on an in-process cluster over loopback gRPC.
+
+Run from the server directory: python -m scripts.bench_failover
+
+The app's settings parse the command line when first imported, so the app is imported
+only once the script has read its own flags and taken them off sys.argv.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from app.schemas import PeerNode
+
+if TYPE_CHECKING:
+    from app.raft.node import RaftNode
+
+
+def make_peers(size: int, base_port: int) -> list[PeerNode]:
+    return [
+        PeerNode(node_id=f"node-{i}", host="127.0.0.1", http_port=0, grpc_port=base_port + i)
+        for i in range(size)
+    ]
+
+
+async def wait_for_leader(nodes: list[RaftNode], timeout: float = 15.0) -> RaftNode:
+    from app.raft.node import Role
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        for node in nodes:
+            if node.role == Role.LEADER:
+                return node
+        await asyncio.sleep(0.001)
+    raise RuntimeError("No leader elected")
+
+
+async def failover(size: int, base_port: int) -> float:
+    from app.canvas.state import Canvas
+    from app.config import settings
+    from app.grpc.server import run_grpc_server
+    from app.raft.node import RaftNode
+
+    peers = make_peers(size, base_port)
+    nodes = []
+    servers = []
+    settings.HOST = "127.0.0.1"
+    for peer in peers:
+        others = [p for p in peers if p.node_id != peer.node_id]
+        node = RaftNode(node_id=peer.node_id, peers=others, canvas=Canvas())
+        settings.GRPC_PORT = peer.grpc_port
+        servers.append(await run_grpc_server(node))
+        nodes.append(node)
+    tasks = [asyncio.create_task(node.start()) for node in nodes]
+
+    try:
+        leader = await wait_for_leader(nodes)
+        # Let the followers learn the leader's heartbeat interval
+        await asyncio.sleep(1.0)
+        assert await leader.submit_pixel(0, 0, 1) is not None
+
+        pos = nodes.index(leader)
+        start = time.perf_counter()
+        tasks[pos].cancel()
+        await servers[pos].stop(0)
+
+        survivors = nodes[:pos] + nodes[pos + 1 :]
+        while True:
+            new_leader = await wait_for_leader(survivors)
+            if await new_leader.submit_pixel(0, 0, 2) is not None:
+                return time.perf_counter() - start
+    finally:
+        for task in tasks:
+            task.cancel()
+        for server in servers:
+            await server.stop(0)
+
+
+async def run(args: argparse.Namespace):
+    results = []
+    for i in range(args.runs):
+        elapsed = await failover(args.size, args.base_port + i * args.size)
+        print(f"run {i + 1}: {elapsed * 1000:.0f} ms")
+        results.append(elapsed)
+    print(f"median {statistics.median(results) * 1000:.0f} ms, max {max(results) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--base-port", type=int, default=52000)
+    args = parser.parse_args()
+    del sys.argv[1:]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Memory and throughput benchmark of the RaftLog layouts.
+
+Run from the server directory: python -m scripts.bench_raft_log
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.generated.grpc.messages_pb2 import AppendEntriesRequest, LogEntry
+from app.raft.columnar import ColumnarRaftLog
+from app.raft.encoding import EntryEncoder
+from app.raft.log import RaftLog
+
+LOG_CLASSES: list[type[RaftLog]] = [RaftLog, ColumnarRaftLog]
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def make_entry(i: int) -> LogEntry:
+    return LogEntry(term=1 + i // 10_000, index=i + 1, x=i % 64, y=(i // 64) % 64, color=i)
+
+
+def bench(log_class: type[RaftLog], size: int, repeat: int) -> dict[str, float]:
+    # Entries are built inside the measured region, as they would be when decoded off
+    # the wire, so the list layout is charged for the objects it keeps alive
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    log = log_class()
+    start = time.perf_counter()
+    for i in range(size):
+        log.append(make_entry(i))
+    append_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    positions = [random.randint(1, size - 512) for _ in range(repeat)]
+    it = iter(positions)
+    slice_time = timed(lambda: log.entries_from(next(it), 512, 1 << 20), repeat)
+
+    # What applying a committed run of entries reads out of the log
+    it = iter(positions)
+    changes_time = timed(lambda: log.pixel_changes(p := next(it), p + 511), repeat)
+
+    it = iter(positions)
+    term_time = timed(lambda: log.term_at(next(it)), repeat)
+
+    # An AppendEntries of 512 entries, serialized from scratch and from the leader's
+    # cache of encoded entries, filled beforehand as by the first follower sent to
+    it = iter(positions)
+    request_time = timed(
+        lambda: AppendEntriesRequest(
+            term=1, entries=log.entries_from(next(it), 512, 1 << 20)
+        ).SerializeToString(),
+        repeat,
+    )
+    encoder = EntryEncoder(log)
+    encoder.MAX_CACHED_ENTRIES = size
+    encoder.encode_from(1, size, 1 << 30)
+    it = iter(positions)
+    cached_time = timed(
+        lambda: AppendEntriesRequest(term=1).SerializeToString()
+        + encoder.encode_from(next(it), 512, 1 << 20)[1],
+        repeat,
+    )
+
+    # Truncation alone is timed, the refill that restores the log size is not
+    cut = size - 512
+    tail = log[cut:]
+    truncate_time = 0.0
+    for _ in range(max(1, repeat // 10)):
+        start = time.perf_counter()
+        log.truncate_from(cut)
+        truncate_time += time.perf_counter() - start
+        for entry in tail:
+            log.append(entry)
+    truncate_time /= max(1, repeat // 10)
+
+    results = {
+        "bytes/entry": memory / size,
+        "append us": append_time / size * 1e6,
+        "slice(512) us": slice_time * 1e6,
+        "pixel_changes(512) us": changes_time * 1e6,
+        "term_at us": term_time * 1e6,
+        "request(512) us": request_time * 1e6,
+        "cached request(512) us": cached_time * 1e6,
+        "truncate(512) us": truncate_time * 1e6,
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-n", type=int, default=200_000)
+    parser.add_argument("--repeat", "-r", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {cls.__name__: bench(cls, args.size, args.repeat) for cls in LOG_CLASSES}
+    metrics = dict.fromkeys(metric for r in results.values() for metric in r)
+
+    print(f"{'':>24}" + "".join(f"{name:>18}" for name in results))
+    for metric in metrics:
+        cells = (f"{r[metric]:>18.2f}" if metric in r else f"{'-':>18}" for r in results.values())
+        print(f"{metric:>24}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Replication throughput and CPU per committed entry, unary AppendEntries against the
+Replicate stream, on an in-process cluster over loopback gRPC.
+
+Run from the server directory: python -m scripts.bench_replication
+
+The app is imported once the flags are read, as in bench_failover.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from scripts.bench_failover import make_peers, wait_for_leader
+
+
+async def bench(size: int, base_port: int, streaming: bool, writes: int, concurrency: int):
+    from app.canvas.state import Canvas
+    from app.config import settings
+    from app.grpc.server import run_grpc_server
+    from app.raft.node import RaftNode
+
+    peers = make_peers(size, base_port)
+    nodes = []
+    servers = []
+    settings.HOST = "127.0.0.1"
+    for peer in peers:
+        others = [p for p in peers if p.node_id != peer.node_id]
+        node = RaftNode(
+            node_id=peer.node_id, peers=others, canvas=Canvas(), stream_replication=streaming
+        )
+        settings.GRPC_PORT = peer.grpc_port
+        servers.append(await run_grpc_server(node))
+        nodes.append(node)
+    tasks = [asyncio.create_task(node.start()) for node in nodes]
+
+    try:
+        leader = await wait_for_leader(nodes)
+        assert await leader.submit_pixel(0, 0, 1) is not None
+
+        async def writer(count: int):
+            for i in range(count):
+                assert await leader.submit_pixel(i % 64, (i // 64) % 64, i) is not None
+
+        # The whole cluster runs in this process, so CPU time covers leader and followers
+        start, cpu_start = time.perf_counter(), time.process_time()
+        await asyncio.gather(*(writer(writes // concurrency) for _ in range(concurrency)))
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+        committed = writes // concurrency * concurrency
+        return committed / elapsed, cpu / committed
+    finally:
+        for task in tasks:
+            task.cancel()
+        for server in servers:
+            await server.stop(0)
+
+
+async def run(args: argparse.Namespace):
+    print(f"{'':>8}{'entries/s':>12}{'cpu us/entry':>14}")
+    for i, streaming in enumerate((False, True)):
+        throughput, cpu = await bench(
+            args.size, args.base_port + i * args.size, streaming, args.writes, args.concurrency
+        )
+        name = "stream" if streaming else "unary"
+        print(f"{name:>8}{throughput:>12.0f}{cpu * 1e6:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--writes", "-n", type=int, default=20_000)
+    # Writers submitting one pixel at a time, few writers leave little to batch
+    parser.add_argument("--concurrency", "-c", type=int, default=8)
+    parser.add_argument("--base-port", type=int, default=52100)
+    args = parser.parse_args()
+    del sys.argv[1:]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from app.canvas.state import Canvas
+from app.generated.grpc.messages_pb2 import LogEntry
+from app.raft.node import RaftNode
+from app.schemas import PeerNode
+
+
+def make_node() -> RaftNode:
+    peers = [PeerNode(node_id=f"n{i}", host="127.0.0.1", http_port=0, grpc_port=0) for i in (2, 3)]
+    return RaftNode(node_id="n1", peers=peers, canvas=Canvas())
+
+
+def pixel(term: int, index: int, color: int) -> LogEntry:
+    return LogEntry(term=term, index=index, x=1, y=1, color=color)
+
+
+async def test_commit_stops_at_entries_the_request_matched():
+    node = make_node()
+    # Indexes 1..3 from the leader of term 1, then 4..6 from a deposed leader of term 2
+    await node.on_append_entries(1, "n2", 0, 0, [pixel(1, i, i) for i in (1, 2, 3)], 0)
+    await node.on_append_entries(2, "n3", 3, 1, [pixel(2, i, 99) for i in (4, 5, 6)], 0)
+
+    # The leader of term 3 commits up to 6 in its own log, but only 1..3 are verified here
+    response = await node.on_append_entries(3, "n2", 1, 1, [pixel(1, 2, 2), pixel(1, 3, 3)], 6)
+    assert response.success
+    assert node.commit_index == 3
+    assert node.canvas.get(1, 1) == 3
+
+    response = await node.on_append_entries(3, "n2", 3, 1, [], 6)
+    assert response.success
+    assert node.commit_index == 3
+
+
+async def test_commit_follows_the_leader_once_entries_match():
+    node = make_node()
+    await node.on_append_entries(1, "n2", 0, 0, [pixel(1, i, i) for i in (1, 2, 3)], 0)
+
+    response = await node.on_append_entries(1, "n2", 3, 1, [], 3)
+    assert response.success
+    assert node.commit_index == 3
+    assert node.canvas.get(1, 1) == 3
+
+
+async def test_compaction_waits_for_followers_to_match_the_snapshot():
+    node = make_node()
+    node.SNAPSHOT_THRESHOLD = 100
+    await node.on_append_entries(1, "n2", 0, 0, [pixel(1, i, i) for i in range(1, 11)], 10)
+    # As the leader, with n3 still missing entries the snapshot would cover
+    node.match_index = {"n2": 10, "n3": 2}
+
+    await node._take_snapshot()
+    assert node.log.snapshot_index == 0
+    assert node.log[3].index == 3
+
+    node.match_index["n3"] = 10
+    node._compact_log()
+    assert node.log.snapshot_index == 10
+
+
+async def test_compaction_stops_waiting_after_a_threshold_of_entries():
+    node = make_node()
+    node.SNAPSHOT_THRESHOLD = 100
+    await node.on_append_entries(1, "n2", 0, 0, [pixel(1, i, i) for i in range(1, 11)], 10)
+    node.match_index = {"n2": 10, "n3": 0}
+    await node._take_snapshot()
+
+    node.SNAPSHOT_THRESHOLD = 5
+    await node.on_append_entries(1, "n2", 10, 1, [pixel(1, i, i) for i in range(11, 16)], 15)
+    assert node.log.snapshot_index == 10
+    # Taken once the previous one compacted, held back for n3 in turn
+    await node._snapshot_task
+    assert node._pending_snapshot.last_included_index == 15